@@ -0,0 +1,161 @@
+"""Headless Chef Vibe: the stealth.py pipeline as a small JSON API.
+
+    GEMINI_KEY=... python api.py --port 8502
+
+    POST /jobs                  {"url": "..."} -> 202 {"id", "status", ...}
+    GET  /jobs/<id>?wait=20     the job, waiting up to `wait` seconds (max
+                                MAX_WAIT) for it to finish first
+    GET  /metrics               Prometheus text
+    GET  /healthz               queue depth
+
+For the iPhone Shortcut and other clients that only want the recipe JSON,
+without a Streamlit session, CSS and a full script run per request. A
+finished job has status "done" and the recipe under "recipe" (meta,
+instructions, ingredients); a failed one has status "error" and an "error"
+message. POSTing a video that is already queued, running or recently done
+returns that job. Set CHEF_API_TOKEN to require "Authorization: Bearer
+<token>" on every route but /healthz.
+"""
+import argparse
+import hmac
+import json
+import os
+import queue
+import sys
+import urllib.parse
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from chef_core import clients, metrics
+from chef_core.jobs import JobQueue
+from chef_core.urls import is_video_url
+
+MAX_WAIT = 60.0         # seconds a GET may long-poll
+MAX_BODY = 64 * 1024
+
+
+class ApiHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    # Headers and body go out in separate writes; with Nagle on, every
+    # response picks up a ~40 ms delayed-ACK stall
+    disable_nagle_algorithm = True
+
+    def log_message(self, fmt, *args):
+        if self.server.verbose:
+            super().log_message(fmt, *args)
+
+    def _send(self, status, body, content_type="application/json", headers=()):
+        if not isinstance(body, (str, bytes)):
+            body = json.dumps(body, ensure_ascii=False)
+        if isinstance(body, str):
+            body = body.encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in headers:
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _authorized(self):
+        token = self.server.token
+        if not token:
+            return True
+        supplied = self.headers.get("Authorization", "").removeprefix("Bearer ").strip()
+        if hmac.compare_digest(supplied.encode(), token.encode()):
+            return True
+        self._send(401, {"error": "Missing or wrong API token."})
+        return False
+
+    def do_GET(self):
+        parts = urllib.parse.urlsplit(self.path)
+        if parts.path == "/healthz":
+            return self._send(200, self.server.jobs.stats())
+        if not self._authorized():
+            return
+        if parts.path == "/metrics":
+            return self._send(200, metrics.prometheus_text(), "text/plain; version=0.0.4")
+        if parts.path.startswith("/jobs/"):
+            job = self.server.jobs.get(parts.path[len("/jobs/"):])
+            if job is None:
+                return self._send(404, {"error": "No such job."})
+            try:
+                wait = float(urllib.parse.parse_qs(parts.query).get("wait", ["0"])[0])
+            except ValueError:
+                return self._send(400, {"error": "wait must be a number of seconds."})
+            if wait > 0:
+                with metrics.span("api/long_poll"):
+                    job.wait(min(wait, MAX_WAIT))
+            return self._send(200, job.to_dict())
+        self._send(404, {"error": "Not found."})
+
+    def do_POST(self):
+        try:
+            length = int(self.headers.get("Content-Length") or 0)
+        except ValueError:
+            length = -1
+        if length < 0:
+            # We can't tell where the body ends, so the connection can't be reused
+            self.close_connection = True
+            return self._send(400, {"error": "Content-Length must be a non-negative integer."})
+        if length > MAX_BODY:
+            self.close_connection = True
+            return self._send(413, {"error": "Request body too large."})
+        body = self.rfile.read(length)
+        if not self._authorized():
+            return
+        if urllib.parse.urlsplit(self.path).path != "/jobs":
+            return self._send(404, {"error": "Not found."})
+        try:
+            url = json.loads(body or b"{}").get("url", "").strip()
+        except (ValueError, AttributeError):
+            return self._send(400, {"error": 'Expected a JSON object like {"url": "..."}.'})
+        if not is_video_url(url):
+            return self._send(400, {"error": "Expected a YouTube, Instagram or TikTok video link."})
+        try:
+            job = self.server.jobs.submit(url)
+        except queue.Full:
+            return self._send(503, {"error": "Too many jobs in flight, try again shortly."},
+                              headers=[("Retry-After", "5")])
+        status = 200 if job.status == "done" else 202
+        self._send(status, job.to_dict(), headers=[("Location", f"/jobs/{job.id}")])
+
+
+def make_server(host, port, jobs, token=None, verbose=False):
+    httpd = ThreadingHTTPServer((host, port), ApiHandler)
+    httpd.daemon_threads = True
+    httpd.jobs = jobs
+    httpd.token = token
+    httpd.verbose = verbose
+    return httpd
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8502)
+    parser.add_argument("--workers", type=int, help="concurrent jobs (default CHEF_API_WORKERS or 4)")
+    parser.add_argument("--api-key", default=os.environ.get("GEMINI_KEY"))
+    parser.add_argument("--token", default=os.environ.get("CHEF_API_TOKEN"),
+                        help="require this bearer token from clients")
+    parser.add_argument("-v", "--verbose", action="store_true", help="log every request")
+    args = parser.parse_args(argv)
+
+    if not args.api_key:
+        parser.error("Missing Gemini API key (use --api-key or set GEMINI_KEY)")
+    clients.configure(args.api_key)
+
+    jobs = JobQueue(max_workers=args.workers) if args.workers else JobQueue()
+    httpd = make_server(args.host, args.port, jobs, args.token, args.verbose)
+    print(f"Chef Vibe API on http://{args.host}:{httpd.server_port}", file=sys.stderr)
+    try:
+        httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        httpd.server_close()
+        jobs.shutdown()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,6 +1,9 @@
 import streamlit as st
-from youtube_transcript_api import YouTubeTranscriptApi
-import google.generativeai as genai
+from chef_core import clients
+from chef_core.cache import cached_transcript
+from chef_core.pipeline import shopping_list
+from chef_core.shopping_list import render_shopping_list, session_shopping_list
+from chef_core.transcripts import youtube_api_transcript
 
 st.set_page_config(page_title="Chef Vibe Final", page_icon="🥗")
 st.title("🥗 Chef Vibe: Final Reset")
@@ -9,35 +12,22 @@ st.title("🥗 Chef Vibe: Final Reset")
 api_key = st.text_input("Enter Gemini API Key:", type="password")
 video_url = st.text_input("Paste YouTube URL:")
 
-if st.button("Rip Recipe"):
+def rip_recipe():
     if not api_key or not video_url:
         st.error("Missing Info!")
-    else:
-        try:
-            # URL Logic
-            if "youtu.be" in video_url:
-                vid_id = video_url.split("/")[-1].split("?")[0]
-            elif "shorts" in video_url:
-                vid_id = video_url.split("shorts/")[1].split("?")[0]
-            else:
-                vid_id = video_url.split("v=")[1].split("&")[0]
+        return None
+    try:
+        with st.spinner("Gettting Transcript..."):
+            full_text = cached_transcript(video_url, youtube_api_transcript)
+        
+        with st.spinner("AI Extracting..."):
+            clients.configure(api_key)
+            return shopping_list(full_text)
+                    
+    except Exception as e:
+        st.error(f"Error: {e}")
 
-            with st.spinner("Gettting Transcript..."):
-                transcript = YouTubeTranscriptApi.get_transcript(vid_id)
-                full_text = " ".join([t['text'] for t in transcript])
-            
-            with st.spinner("AI Extracting..."):
-                genai.configure(api_key=api_key)
-                model = genai.GenerativeModel('gemini-1.5-flash')
-                response = model.generate_content(f"Extract ingredients from: {full_text[:10000]}. Return ONLY list separated by |")
-                
-                st.success("Done!")
-                items = response.text.split("|")
-                for item in items:
-                    if item.strip():
-                        col1, col2 = st.columns([3, 1])
-                        with col1: st.checkbox(item.strip())
-                        with col2: st.link_button("Buy ↗️", f"https://www.instacart.com/store/search?term={item.strip()}")
-                        
-        except Exception as e:
-            st.error(f"Error: {e}")
\ No newline at end of file
+items = session_shopping_list(video_url, rip_recipe if st.button("Rip Recipe") else None)
+if items is not None:
+    st.success("Done!")
+    render_shopping_list(items)
\ No newline at end of file
@@ -0,0 +1,139 @@
+"""Headless Chef Vibe: run the stealth.py pipeline over a list of URLs.
+
+    python batch.py urls.txt -o recipes.jsonl
+    cat urls.txt | python batch.py - --transcript-workers 16 --llm-workers 4
+
+One JSON object is appended per URL as soon as it finishes. URLs that already
+have a recipe in the output file are skipped, so an interrupted run can simply
+be started again. Failed URLs are written with an "error" field and retried on
+the next run. --metrics writes per-stage timings and counters at the end, as
+Prometheus text if the path ends in .prom and JSON lines otherwise.
+"""
+import argparse
+import json
+import os
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from chef_core import clients, metrics
+from chef_core.http_session import connection_stats
+from chef_core.mapreduce import extract_recipe_chunked
+from chef_core.models import get_valid_model, resolve_model
+from chef_core.pipeline import extract_recipe
+from chef_core.transcripts import fetch_transcript
+
+
+def read_urls(source):
+    stream = sys.stdin if source == "-" else open(source, encoding="utf-8")
+    with stream:
+        seen = set()
+        for line in stream:
+            url = line.strip()
+            if url and not url.startswith("#") and url not in seen:
+                seen.add(url)
+                yield url
+
+
+def load_done(path):
+    """URLs that already have a successful record in `path`."""
+    done = set()
+    if not os.path.exists(path):
+        return done
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except ValueError:
+                continue  # Half-written line from a killed run
+            if "error" not in record and record.get("url"):
+                done.add(record["url"])
+    return done
+
+
+class JsonlWriter:
+    def __init__(self, path):
+        self._file = open(path, "a", encoding="utf-8")
+        self._lock = threading.Lock()
+        self.ok = 0
+        self.failed = 0
+
+    def write(self, record):
+        line = json.dumps(record, ensure_ascii=False)
+        with self._lock:
+            self._file.write(line + "\n")
+            self._file.flush()
+            if "error" in record:
+                self.failed += 1
+            else:
+                self.ok += 1
+            print(f"[{self.ok} ok / {self.failed} failed] {record['url']}", file=sys.stderr)
+
+    def close(self):
+        self._file.close()
+
+
+def run_extraction(writer, url, transcript_text, model_name, chunked=False):
+    try:
+        if chunked:
+            recipe = extract_recipe_chunked(transcript_text, model_name)
+        else:
+            recipe = extract_recipe(transcript_text, model_name)
+        # model_name is pinned for the run; record whichever model answered
+        writer.write({"url": url, "model": resolve_model(model_name), **recipe})
+    except Exception as e:
+        writer.write({"url": url, "error": f"AI Error: {e}"})
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("urls", help="file with one URL per line, or - for stdin")
+    parser.add_argument("-o", "--output", default="recipes.jsonl")
+    parser.add_argument("--transcript-workers", type=int, default=8)
+    parser.add_argument("--llm-workers", type=int, default=4)
+    parser.add_argument("--api-key", default=os.environ.get("GEMINI_KEY"))
+    parser.add_argument("--chunked", action="store_true",
+                        help="map-reduce over the whole transcript (long videos)")
+    parser.add_argument("--metrics", help="write stage timings here (.prom or .jsonl)")
+    args = parser.parse_args(argv)
+
+    if not args.api_key:
+        parser.error("Missing Gemini API key (use --api-key or set GEMINI_KEY)")
+    clients.configure(args.api_key)
+    model_name = get_valid_model()
+
+    done = load_done(args.output)
+    todo = [url for url in read_urls(args.urls) if url not in done]
+    print(f"{len(todo)} URLs to process, {len(done)} already done", file=sys.stderr)
+
+    writer = JsonlWriter(args.output)
+    # Transcript fetches and Gemini calls get separate pools so a slow model
+    # doesn't stop us downloading captions for the next URLs.
+    with ThreadPoolExecutor(args.transcript_workers) as fetch_pool, \
+            ThreadPoolExecutor(args.llm_workers) as llm_pool:
+        fetches = {fetch_pool.submit(fetch_transcript, url): url for url in todo}
+        for future in as_completed(fetches):
+            url = fetches[future]
+            try:
+                transcript_text = future.result()
+            except Exception as e:
+                transcript_text = f"Download Error: {e}"
+            if "Error" in transcript_text:
+                writer.write({"url": url, "error": transcript_text})
+                continue
+            llm_pool.submit(run_extraction, writer, url, transcript_text, model_name, args.chunked)
+    writer.close()
+    stats = connection_stats()
+    print(
+        f"Done: {writer.ok} ok, {writer.failed} failed. Caption downloads: "
+        f"{stats['requests']} requests over {stats['connections']} connections",
+        file=sys.stderr,
+    )
+    if args.metrics:
+        with open(args.metrics, "w", encoding="utf-8") as f:
+            f.write(metrics.prometheus_text() if args.metrics.endswith(".prom") else metrics.json_lines())
+    return 0 if writer.failed == 0 else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
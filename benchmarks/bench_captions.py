@@ -0,0 +1,118 @@
+"""Micro-benchmarks for chef_core.captions on large synthetic caption files.
+
+    python benchmarks/bench_captions.py [--cues 20000] [--repeat 5]
+
+Each format is timed with the old copy-pasted parsing (json.loads + nested
+loops, or a blanket tag regex) and with parse_captions(). The table also
+shows output size, so the effect of rolling-duplicate collapsing is visible.
+"""
+import argparse
+import json
+import os
+import random
+import re
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from chef_core.captions import parse_captions  # noqa: E402
+
+WORDS = (
+    "so today we're making a quick garlic butter pasta add two cups of flour "
+    "and three eggs whisk it together then season with salt and pepper"
+).split()
+
+
+def _sentences(n, seed=7):
+    rng = random.Random(seed)
+    return [" ".join(rng.choice(WORDS) for _ in range(rng.randint(4, 9))) for _ in range(n)]
+
+
+def make_json3(lines):
+    events = []
+    for i, line in enumerate(lines):
+        words = line.split()
+        segs = [{"utf8": words[0]}] + [{"utf8": " " + w, "tOffsetMs": 120 * j} for j, w in enumerate(words[1:], 1)]
+        events.append({"tStartMs": i * 2000, "dDurationMs": 2000, "wWinId": 1, "segs": segs})
+        events.append({"tStartMs": i * 2000 + 1990, "dDurationMs": 10, "aAppend": 1, "segs": [{"utf8": "\n"}]})
+    return json.dumps({"wireMagic": "pb3", "events": events})
+
+
+def make_srv3(lines):
+    body = "".join(
+        f'<p t="{i * 2000}" d="2000" w="1">'
+        + "".join(f"<s t=\"{j * 120}\">{' ' if j else ''}{w}</s>" for j, w in enumerate(line.split()))
+        + "</p>"
+        for i, line in enumerate(lines)
+    )
+    return f'<?xml version="1.0" encoding="utf-8" ?><timedtext format="3"><body>{body}</body></timedtext>'
+
+
+def make_rolling_vtt(lines):
+    # YouTube auto-captions: every cue repeats the previous line above the new one
+    out = ["WEBVTT", "Kind: captions", "Language: en", ""]
+    previous = ""
+    for i, line in enumerate(lines):
+        out.append(f"00:{i // 30:02d}:{(i * 2) % 60:02d}.000 --> 00:{i // 30:02d}:{(i * 2) % 60:02d}.990 align:start position:0%")
+        if previous:
+            out.append(previous)
+        words = line.split()
+        out.append(words[0] + "".join(f"<00:00:00.{j:03d}><c> {w}</c>" for j, w in enumerate(words[1:], 1)))
+        out.append("")
+        previous = line
+    return "\n".join(out)
+
+
+def make_srt(lines):
+    out = []
+    for i, line in enumerate(lines, 1):
+        out += [str(i), f"00:00:{i % 60:02d},000 --> 00:00:{i % 60:02d},900", line, ""]
+    return "\n".join(out)
+
+
+def old_json3(payload):
+    data = json.loads(payload)
+    full_text = []
+    for event in data.get('events', []):
+        for seg in event.get('segs', []):
+            if seg.get('utf8'):
+                full_text.append(seg['utf8'])
+    return " ".join(full_text)
+
+
+def old_regex(payload):
+    return re.sub(r'<[^>]+>', ' ', payload)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="caption parser micro-benchmarks")
+    parser.add_argument("--cues", type=int, default=20000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args(argv)
+
+    lines = _sentences(args.cues)
+    cases = [
+        ("json3", make_json3(lines), old_json3),
+        ("srv3", make_srv3(lines), old_regex),
+        ("vtt", make_rolling_vtt(lines), old_regex),
+        ("srt", make_srt(lines), None),
+    ]
+
+    print(f"{'format':<7}{'input KB':>10}{'old ms':>10}{'new ms':>10}{'old chars':>11}{'new chars':>11}")
+    for name, payload, old in cases:
+        new_ms = min(timeit.repeat(lambda: parse_captions(payload), number=1, repeat=args.repeat)) * 1000
+        new_len = len(parse_captions(payload))
+        if old is not None:
+            old_ms = min(timeit.repeat(lambda: old(payload), number=1, repeat=args.repeat)) * 1000
+            old_len = len(old(payload))
+            old_cols = f"{old_ms:>10.1f}"
+            old_size = f"{old_len:>11}"
+        else:
+            old_cols = f"{'-':>10}"
+            old_size = f"{'-':>11}"
+        print(f"{name:<7}{len(payload) / 1024:>10.0f}{old_cols}{new_ms:>10.1f}{old_size}{new_len:>11}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,244 @@
+"""End-to-end pipeline benchmark, fully offline.
+
+    python benchmarks/bench_pipeline.py [--samples 20] [--concurrency 4]
+    python benchmarks/bench_pipeline.py --save-baseline
+    python benchmarks/bench_pipeline.py --check [--tolerance 0.25]
+
+The real chef_core code runs against benchmarks/stubs.py: yt-dlp's page
+probe and youtube-transcript-api are swapped for calls to the stub server,
+caption downloads go through the shared requests session to recorded
+fixtures, and google-generativeai talks REST to a fake Gemini endpoint. The
+transcript, caption track and recipe caches are pointed at a throwaway
+directory with a zero byte budget and the near-duplicate index is off, so
+every sample is a miss.
+
+Each stage is reported as p50/p95 latency over --samples calls plus the peak
+Python heap (tracemalloc) of one extra call, and the full URL -> recipe path
+is also run --concurrency wide for throughput. --save-baseline writes the
+numbers to benchmarks/baseline.json; --check compares against it and exits
+1 on a regression. Baselines are only comparable on the same machine with
+the same stub latencies, so re-save one before relying on --check.
+"""
+import argparse
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+import warnings
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, fields
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(HERE))
+sys.path.insert(0, HERE)
+
+# Must be set before chef_core.cache is imported
+os.environ["CHEF_CACHE_DIR"] = tempfile.mkdtemp(prefix="chef-bench-")
+os.environ["CHEF_TRANSCRIPT_CACHE_MB"] = "0"
+os.environ["CHEF_RECIPE_CACHE_MB"] = "0"
+os.environ["CHEF_CAPTION_CACHE_MB"] = "0"
+os.environ["CHEF_SIMILARITY_MAX_DOCS"] = "0"
+# The stub has no quota; the scheduler's limiter would only measure itself
+os.environ["CHEF_GEMINI_RPM"] = "0"
+
+from chef_core import clients, models, transcripts  # noqa: E402
+from chef_core.http_session import connection_stats, get_session  # noqa: E402
+from chef_core.ingredients import extract_ingredients  # noqa: E402
+from chef_core.pipeline import extract_recipe, extract_recipe_structured, stream_recipe  # noqa: E402
+from chef_core.recipe import build_recipe_prompt  # noqa: E402
+from chef_core.urls import canonical_video_key, extract_youtube_id  # noqa: E402
+from stubs import VIDEOS, Latency, StubServer  # noqa: E402
+
+BASELINE = os.path.join(HERE, "baseline.json")
+MODEL = "models/gemini-1.5-flash"
+# Absolute slack on top of --tolerance, so sub-millisecond stages don't flap
+SLACK_MS = 2.0
+SLACK_KB = 64.0
+
+URLS = {fixture.rsplit(".", 1)[1]: f"https://www.youtube.com/watch?v={video_id}" for video_id, fixture in VIDEOS.items()}
+
+
+def install_stubs(server):
+    """Point the real transcript and Gemini code at the stub server."""
+    session = get_session()
+
+    def probe(url):
+        response = session.get(f"{server.url}/probe", params={"v": extract_youtube_id(url)})
+        return response.json() if response.status_code == 200 else None
+
+    def fetch_lines(video_id):
+        response = session.get(f"{server.url}/transcript", params={"v": video_id})
+        response.raise_for_status()
+        return response.json()
+
+    transcripts.probe_captions = probe
+    clients.fetch_youtube_transcript = fetch_lines
+    clients.genai().configure(api_key="benchmark", transport="rest", client_options={"api_endpoint": server.url})
+
+
+def _transcript(text):
+    if not transcripts.is_valid_transcript(text):
+        raise RuntimeError(f"stub transcript failed: {text[:200]}")
+    return text
+
+
+def _recipe(recipe):
+    if not recipe["ingredients"]:
+        raise RuntimeError(f"stub recipe failed to parse: {recipe}")
+    return recipe
+
+
+def end_to_end(url):
+    text = _transcript(transcripts.get_stealth_transcript(url))
+    return _recipe(extract_recipe(text, MODEL))
+
+
+def stream_sections(text):
+    """(seconds to the first section, whole recipe) for one streamed call."""
+    start = time.perf_counter()
+    first = None
+    recipe = {}
+    for key, value in stream_recipe(text, MODEL):
+        if first is None:
+            first = time.perf_counter() - start
+        recipe[key] = value
+    return first, _recipe(recipe)
+
+
+def build_stages():
+    """name -> zero-argument callable; ytdlp gets one stage per fixture format."""
+    urls = list(URLS.values())
+    text = _transcript(transcripts.youtube_api_transcript(urls[0]))
+    stages = {
+        "url": lambda: [canonical_video_key(u) for u in urls],
+        "transcript/youtube_api": lambda: _transcript(transcripts.youtube_api_transcript(urls[0])),
+    }
+    for fmt, url in URLS.items():
+        stages[f"transcript/ytdlp:{fmt}"] = lambda url=url: _transcript(transcripts.ytdlp_transcript(url))
+    stages.update({
+        "transcript/hedged": lambda: _transcript(transcripts.get_stealth_transcript(urls[0])),
+        "condense": lambda: build_recipe_prompt(text),
+        "ingredients/local": lambda: extract_ingredients(text),
+        "model/discover": models._discover,
+        "llm/generate": lambda: _recipe(extract_recipe(text, MODEL)),
+        "llm/stream": lambda: stream_sections(text),
+        "llm/structured": lambda: _recipe(extract_recipe_structured(text, MODEL)),
+        "end_to_end": lambda: end_to_end(urls[0]),
+    })
+    return stages, text
+
+
+def _summary(samples):
+    samples = sorted(samples)
+    p95 = statistics.quantiles(samples, n=20)[-1] if len(samples) > 1 else samples[0]
+    return {"p50_ms": round(statistics.median(samples) * 1000, 3), "p95_ms": round(p95 * 1000, 3)}
+
+
+def peak_kb(fn):
+    tracemalloc.start()
+    try:
+        tracemalloc.reset_peak()
+        base = tracemalloc.get_traced_memory()[0]
+        fn()
+        return round((tracemalloc.get_traced_memory()[1] - base) / 1024, 1)
+    finally:
+        tracemalloc.stop()
+
+
+def run(samples, concurrency):
+    stages, text = build_stages()
+    results = {}
+    for name, fn in stages.items():
+        fn()  # warm up connections and lazy imports
+        timings, first = [], []
+        for _ in range(samples):
+            t = time.perf_counter()
+            out = fn()
+            timings.append(time.perf_counter() - t)
+            if name == "llm/stream":
+                first.append(out[0])
+        results[name] = _summary(timings)
+        results[name]["peak_kb"] = peak_kb(fn)
+        if first:
+            results["llm/stream:first_section"] = _summary(first)
+
+    urls = [list(URLS.values())[i % len(URLS)] for i in range(samples * concurrency)]
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        t = time.perf_counter()
+        list(pool.map(end_to_end, urls))
+        elapsed = time.perf_counter() - t
+    throughput = round(len(urls) / elapsed, 2)
+    return results, throughput, len(text)
+
+
+def compare(results, throughput, baseline, tolerance):
+    """Regressions as human-readable strings, empty when all is well."""
+    problems = []
+    for name, stats in results.items():
+        base = baseline["stages"].get(name)
+        if base is None:
+            continue
+        if stats["p95_ms"] > base["p95_ms"] * (1 + tolerance) + SLACK_MS:
+            problems.append(f"{name}: p95 {stats['p95_ms']:.1f} ms vs baseline {base['p95_ms']:.1f} ms")
+        if "peak_kb" in stats and "peak_kb" in base and stats["peak_kb"] > base["peak_kb"] * (1 + tolerance) + SLACK_KB:
+            problems.append(f"{name}: peak {stats['peak_kb']:.0f} KB vs baseline {base['peak_kb']:.0f} KB")
+    if throughput < baseline["throughput_per_s"] * (1 - tolerance):
+        problems.append(f"throughput {throughput:.2f}/s vs baseline {baseline['throughput_per_s']:.2f}/s")
+    return problems
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="offline end-to-end pipeline benchmark")
+    parser.add_argument("--samples", type=int, default=20)
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--save-baseline", action="store_true", help=f"write results to {BASELINE}")
+    parser.add_argument("--check", action="store_true", help="exit 1 if slower or bigger than the baseline")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="allowed relative regression (default 0.25)")
+    for field in fields(Latency):
+        parser.add_argument(f"--{field.name.replace('_', '-')}", type=type(field.default), default=field.default)
+    args = parser.parse_args(argv)
+    warnings.simplefilter("ignore")
+
+    latency = Latency(**{field.name: getattr(args, field.name) for field in fields(Latency)})
+    # Sample count is left out: it changes precision, not what is measured
+    config = {"concurrency": args.concurrency, **asdict(latency)}
+
+    with StubServer(latency) as server:
+        install_stubs(server)
+        results, throughput, transcript_chars = run(args.samples, args.concurrency)
+
+    baseline = None
+    if args.check:
+        with open(BASELINE) as f:
+            baseline = json.load(f)
+        if baseline["config"] != config:
+            print(f"baseline was recorded with {baseline['config']}, not {config}", file=sys.stderr)
+            return 2
+
+    print(f"{'stage':<28}{'p50 ms':>10}{'p95 ms':>10}{'peak KB':>10}{'base p95':>10}")
+    for name, stats in results.items():
+        peak = f"{stats['peak_kb']:>10.0f}" if "peak_kb" in stats else f"{'-':>10}"
+        base = baseline["stages"].get(name) if baseline else None
+        base_col = f"{base['p95_ms']:>10.1f}" if base else ""
+        print(f"{name:<28}{stats['p50_ms']:>10.2f}{stats['p95_ms']:>10.2f}{peak}{base_col}")
+    print(f"\nend_to_end throughput: {throughput:.2f} recipes/s at concurrency {args.concurrency}")
+    print(f"transcript: {transcript_chars} chars, http: {connection_stats()}")
+
+    if args.save_baseline:
+        with open(BASELINE, "w") as f:
+            json.dump({"config": config, "samples": args.samples, "stages": results, "throughput_per_s": throughput}, f, indent=2)
+            f.write("\n")
+        print(f"baseline written to {BASELINE}")
+    if baseline is not None:
+        problems = compare(results, throughput, baseline, args.tolerance)
+        for problem in problems:
+            print(f"REGRESSION {problem}", file=sys.stderr)
+        return 1 if problems else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
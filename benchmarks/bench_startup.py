@@ -0,0 +1,86 @@
+"""Cold start and per-rerun cost of the Streamlit scripts.
+
+    python benchmarks/bench_startup.py [--runs 5]
+
+"cold" starts a fresh interpreter per sample and times everything the
+script imports at module level on top of streamlit itself, which is what a
+new Streamlit worker pays before the first paint. "first run" and "rerun"
+drive the real script with streamlit's AppTest, without clicking anything,
+the same way a widget interaction reruns it.
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+import warnings
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SCRIPTS = ["app.py", "verdict.py", "bunker_chef.py", "jailbreak.py", "industrial.py", "stealth.py", "meal_plan.py"]
+HEAVY = ("google.generativeai", "yt_dlp", "youtube_transcript_api", "pytubefix")
+
+# Runs inside a fresh interpreter: only the script's top-level import
+# statements are executed, so no Streamlit page is built.
+_COLD = """
+import sys, time, ast
+sys.path.insert(0, {root!r})
+import streamlit
+t = time.perf_counter()
+tree = ast.parse(open({path!r}).read())
+imports = [n for n in tree.body if isinstance(n, (ast.Import, ast.ImportFrom, ast.Try))]
+exec(compile(ast.Module(body=imports, type_ignores=[]), {path!r}, "exec"), {{}})
+elapsed = time.perf_counter() - t
+heavy = [m for m in {heavy!r} if m in sys.modules]
+print(elapsed, ",".join(heavy))
+"""
+
+
+def cold_import(script, runs):
+    samples, heavy = [], ""
+    for _ in range(runs):
+        code = _COLD.format(root=ROOT, path=os.path.join(ROOT, script), heavy=HEAVY)
+        out = subprocess.run([sys.executable, "-W", "ignore", "-c", code],
+                             capture_output=True, text=True, cwd=ROOT)
+        if out.returncode != 0:
+            return None, out.stderr.strip().splitlines()[-1]
+        elapsed, heavy = out.stdout.split()[0], " ".join(out.stdout.split()[1:])
+        samples.append(float(elapsed))
+    return statistics.median(samples), heavy
+
+
+def app_runs(script, runs):
+    from streamlit.testing.v1 import AppTest
+
+    at = AppTest.from_file(os.path.join(ROOT, script), default_timeout=60)
+    at.secrets["GEMINI_KEY"] = "benchmark"
+    t = time.perf_counter()
+    at.run()
+    first = time.perf_counter() - t
+    reruns = []
+    for _ in range(runs):
+        t = time.perf_counter()
+        at.run()
+        reruns.append(time.perf_counter() - t)
+    return first, statistics.median(reruns)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="startup benchmarks")
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args(argv)
+    warnings.simplefilter("ignore")
+    sys.path.insert(0, ROOT)
+
+    print(f"{'script':<16}{'cold ms':>10}{'first run ms':>14}{'rerun ms':>10}  heavy modules loaded at import")
+    for script in SCRIPTS:
+        cold, heavy = cold_import(script, args.runs)
+        if cold is None:
+            print(f"{script:<16}{'n/a':>10}  {heavy}")
+            continue
+        first, rerun = app_runs(script, args.runs)
+        print(f"{script:<16}{cold * 1000:>10.0f}{first * 1000:>14.0f}{rerun * 1000:>10.1f}  {heavy or '-'}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,241 @@
+"""Local stand-ins for YouTube and Gemini, used by bench_pipeline.py.
+
+One ThreadingHTTPServer on 127.0.0.1, run in a child process, answers:
+
+    GET  /probe?v=<id>                       caption track list, like yt-dlp's info dict
+    GET  /captions/<fixture>                 a recorded payload from benchmarks/fixtures
+    GET  /transcript?v=<id>                  caption lines, like youtube-transcript-api
+    GET  /v1beta/models                      Gemini model catalogue
+    POST /v1beta/models/<m>:generateContent
+    POST /v1beta/models/<m>:streamGenerateContent
+
+The Gemini routes speak the REST wire format, so the real google-generativeai
+client is pointed at them with transport="rest". Every route sleeps for its
+configured latency before answering; streamed responses send the canned
+recipe in `chunks` pieces, `chunk_ms` apart, after `ttft_ms`. A request for
+JSON output (response_mime_type) gets the same recipe in the compact
+structured layout, limited to the keys in its schema, an instructions-only
+prompt gets no ingredients section, and non-streamed answers take time in
+proportion to their length.
+"""
+import json
+import multiprocessing
+import os
+import time
+import urllib.parse
+from dataclasses import dataclass
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+
+# Video IDs the stubs know about, one per recorded caption format
+VIDEOS = {
+    "shrimpjson3": "shrimp_pasta.json3",
+    "shrimpsrv3x": "shrimp_pasta.srv3",
+    "shrimpvttxx": "shrimp_pasta.vtt",
+}
+
+RECIPE_RESPONSE = (
+    "Garlic Butter Shrimp Pasta | 20 mins\n###SPLIT###\n"
+    "1. Boil a large pot of generously salted water.\n"
+    "2. Pat the shrimp dry and season with salt, pepper and red pepper flakes.\n"
+    "3. Cook the spaghetti one minute short of the package time, reserving 1 cup of pasta water.\n"
+    "4. Sear the shrimp in olive oil for 1-2 minutes per side, then set aside.\n"
+    "5. Melt the butter, cook the garlic for 30 seconds, then deglaze with white wine and reduce by half.\n"
+    "6. Toss in the pasta with 1/2 cup pasta water, lemon juice, zest and parmesan.\n"
+    "7. Return the shrimp, finish with parsley and serve with lemon wedges.\n"
+    "###SPLIT###\n"
+    "1 lb Large shrimp\n1/2 tsp Salt\n1/4 tsp Black pepper\nPinch Red pepper flakes\n"
+    "6 cloves Garlic\n2 tbsp Parsley\n1 Lemon\n12 oz Spaghetti\n2 tbsp Olive oil\n"
+    "4 tbsp Butter\n1/2 cup Dry white wine\n1/3 cup Parmesan cheese"
+)
+
+
+def _structured(response):
+    """The same recipe in the compact JSON layout of recipe.STRUCTURED_PROMPT."""
+    meta, steps, ingredients = response.split("###SPLIT###")
+    return {
+        "m": meta.strip(),
+        "s": [line.split(". ", 1)[1] for line in steps.strip().splitlines()],
+        "i": ingredients.strip().splitlines(),
+    }
+
+
+STRUCTURED_RESPONSE = _structured(RECIPE_RESPONSE)
+
+
+def _answer(body):
+    """What a well-behaved model would send back for this request body."""
+    request = json.loads(body or b"{}")
+    config = request.get("generationConfig") or {}
+    if config.get("responseMimeType") == "application/json":
+        keys = list((config.get("responseSchema") or {}).get("properties") or STRUCTURED_RESPONSE)
+        return json.dumps({key: STRUCTURED_RESPONSE[key] for key in keys}, separators=(",", ":"))
+    if "ingredient list is already done" in json.dumps(request.get("contents")):
+        # recipe.INSTRUCTIONS_PROMPT: metadata and steps only
+        return RECIPE_RESPONSE.rsplit("###SPLIT###", 1)[0]
+    return RECIPE_RESPONSE
+
+
+@dataclass
+class Latency:
+    """Per-route delays in milliseconds."""
+    probe_ms: float = 300
+    caption_ms: float = 80
+    transcript_ms: float = 250
+    models_ms: float = 150
+    ttft_ms: float = 400
+    chunk_ms: float = 60
+    chunks: int = 8
+
+
+def _pieces(text, n):
+    size = max(1, -(-len(text) // max(1, n)))
+    return [text[i:i + size] for i in range(0, len(text), size)]
+
+
+def _candidate(text):
+    return {"candidates": [{"content": {"parts": [{"text": text}], "role": "model"}, "index": 0}]}
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    # Headers and body go out in separate writes; with Nagle on, every
+    # response picks up a ~40 ms delayed-ACK stall
+    disable_nagle_algorithm = True
+
+    def log_message(self, *args):
+        pass
+
+    @property
+    def latency(self):
+        return self.server.latency
+
+    def _send(self, status, body, content_type="application/json"):
+        if isinstance(body, str):
+            body = body.encode()
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _chunk(self, data):
+        self.wfile.write(f"{len(data):x}\r\n".encode() + data + b"\r\n")
+        self.wfile.flush()
+
+    def do_GET(self):
+        parts = urllib.parse.urlsplit(self.path)
+        query = urllib.parse.parse_qs(parts.query)
+        video_id = query.get("v", [""])[0]
+        base = f"http://127.0.0.1:{self.server.server_port}"
+
+        if parts.path == "/probe":
+            time.sleep(self.latency.probe_ms / 1000)
+            fixture = VIDEOS.get(video_id)
+            if fixture is None:
+                return self._send(404, "{}")
+            ext = fixture.rsplit(".", 1)[1]
+            return self._send(200, json.dumps({"en": [{"ext": ext, "url": f"{base}/captions/{fixture}"}]}))
+
+        if parts.path.startswith("/captions/"):
+            time.sleep(self.latency.caption_ms / 1000)
+            payload = self.server.fixtures.get(parts.path.rsplit("/", 1)[1])
+            if payload is None:
+                return self._send(404, "")
+            return self._send(200, payload, "text/plain; charset=utf-8")
+
+        if parts.path == "/transcript":
+            time.sleep(self.latency.transcript_ms / 1000)
+            lines = self.server.lines.get(video_id)
+            if lines is None:
+                return self._send(404, "[]")
+            return self._send(200, json.dumps(lines))
+
+        if parts.path == "/v1beta/models":
+            time.sleep(self.latency.models_ms / 1000)
+            models = [
+                {"name": name, "supportedGenerationMethods": ["generateContent", "countTokens"]}
+                for name in ("models/gemini-1.5-flash", "models/gemini-1.5-pro")
+            ]
+            return self._send(200, json.dumps({"models": models}))
+
+        self._send(404, "{}")
+
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        path = urllib.parse.urlsplit(self.path).path
+        time.sleep(self.latency.ttft_ms / 1000)
+
+        if path.endswith(":generateContent"):
+            text = _answer(body)
+            # Non-streaming callers wait for the whole generation, which
+            # scales with its length
+            chunks = (self.latency.chunks - 1) * len(text) / len(RECIPE_RESPONSE)
+            time.sleep(self.latency.chunk_ms * chunks / 1000)
+            response = _candidate(text)
+            response["candidates"][0]["finishReason"] = "STOP"
+            return self._send(200, json.dumps(response))
+
+        if path.endswith(":streamGenerateContent"):
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Transfer-Encoding", "chunked")
+            self.end_headers()
+            self._chunk(b"[")
+            for i, piece in enumerate(_pieces(_answer(body), self.latency.chunks)):
+                if i:
+                    time.sleep(self.latency.chunk_ms / 1000)
+                self._chunk((b"," if i else b"") + json.dumps(_candidate(piece)).encode())
+            self._chunk(b"]")
+            self.wfile.write(b"0\r\n\r\n")
+            return
+
+        self._send(404, "{}")
+
+
+def _serve(latency, conn):
+    from chef_core.captions import PARSERS
+
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+    httpd.daemon_threads = True
+    httpd.latency = latency
+    httpd.fixtures = {}
+    httpd.lines = {}
+    for video_id, fixture in VIDEOS.items():
+        with open(os.path.join(FIXTURES, fixture), encoding="utf-8") as f:
+            payload = f.read()
+        httpd.fixtures[fixture] = payload
+        # youtube-transcript-api hands back the cue lines, not a file
+        parse = PARSERS[fixture.rsplit(".", 1)[1]]
+        httpd.lines[video_id] = [line for line in parse(payload) if line.strip()]
+    conn.send(httpd.server_port)
+    httpd.serve_forever()
+
+
+class StubServer:
+    """The stub routes on an ephemeral port.
+
+    Served from a child process, so the stubs neither hold the GIL nor show
+    up in the harness's tracemalloc numbers.
+    """
+
+    def __init__(self, latency=None):
+        self.latency = latency or Latency()
+        self.port = None
+        self._process = None
+
+    @property
+    def url(self):
+        return f"http://127.0.0.1:{self.port}"
+
+    def __enter__(self):
+        parent, child = multiprocessing.Pipe()
+        self._process = multiprocessing.Process(target=_serve, args=(self.latency, child), daemon=True)
+        self._process.start()
+        self.port = parent.recv()
+        return self
+
+    def __exit__(self, *exc):
+        self._process.terminate()
+        self._process.join()
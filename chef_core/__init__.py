@@ -0,0 +1 @@
+"""Shared building blocks for the Chef Vibe Streamlit apps."""
@@ -0,0 +1,241 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+import urllib.parse
+import zlib
+
+from chef_core import metrics
+from chef_core.urls import canonical_video_key
+
+CACHE_DIR = os.environ.get(
+    "CHEF_CACHE_DIR", os.path.join(os.path.expanduser("~"), ".cache", "chef-vibe")
+)
+
+
+class DiskCache:
+    """Small SQLite-backed key/value cache shared by every Streamlit session.
+
+    Values are strings, stored zlib-compressed. Entries expire after `ttl`
+    seconds and the least recently used ones are evicted once the compressed
+    total goes over `max_bytes`. Hit/miss counters are kept per process.
+    """
+
+    def __init__(self, path, table="entries", ttl=7 * 24 * 3600, max_bytes=64 * 1024 * 1024):
+        self.path = path
+        self.table = table
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            f"CREATE TABLE IF NOT EXISTS {table} ("
+            "key TEXT PRIMARY KEY, value BLOB NOT NULL, size INTEGER NOT NULL, "
+            "created REAL NOT NULL, accessed REAL NOT NULL)"
+        )
+        self._conn.execute(f"CREATE INDEX IF NOT EXISTS {table}_accessed ON {table}(accessed)")
+
+    def get(self, key):
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                f"SELECT value, created FROM {self.table} WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                self.misses += 1
+                metrics.incr("cache_lookups", cache=self.table, result="miss")
+                return None
+            if self.ttl and now - row[1] > self.ttl:
+                self._conn.execute(f"DELETE FROM {self.table} WHERE key = ?", (key,))
+                self.misses += 1
+                metrics.incr("cache_lookups", cache=self.table, result="expired")
+                return None
+            self._conn.execute(f"UPDATE {self.table} SET accessed = ? WHERE key = ?", (now, key))
+            self.hits += 1
+        metrics.incr("cache_lookups", cache=self.table, result="hit")
+        return zlib.decompress(row[0]).decode("utf-8")
+
+    def set(self, key, value):
+        if not self.max_bytes:
+            return  # Disabled, don't even pay for the compressor
+        blob = zlib.compress(value.encode("utf-8"), 6)
+        if len(blob) > self.max_bytes:
+            return
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                f"INSERT OR REPLACE INTO {self.table} (key, value, size, created, accessed) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (key, blob, len(blob), now, now),
+            )
+            self._evict(now)
+
+    def _evict(self, now):
+        if self.ttl:
+            cur = self._conn.execute(f"DELETE FROM {self.table} WHERE created < ?", (now - self.ttl,))
+            self.evictions += cur.rowcount
+        total = self._conn.execute(f"SELECT COALESCE(SUM(size), 0) FROM {self.table}").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        # Walk from the least recently used end until we're back under budget
+        doomed = []
+        for key, size in self._conn.execute(f"SELECT key, size FROM {self.table} ORDER BY accessed"):
+            if total <= self.max_bytes:
+                break
+            doomed.append((key,))
+            total -= size
+        self._conn.executemany(f"DELETE FROM {self.table} WHERE key = ?", doomed)
+        self.evictions += len(doomed)
+
+    def delete(self, key):
+        with self._lock:
+            self._conn.execute(f"DELETE FROM {self.table} WHERE key = ?", (key,))
+
+    def clear(self):
+        with self._lock:
+            self._conn.execute(f"DELETE FROM {self.table}")
+
+    def stats(self):
+        with self._lock:
+            entries, total = self._conn.execute(
+                f"SELECT COUNT(*), COALESCE(SUM(size), 0) FROM {self.table}"
+            ).fetchone()
+        lookups = self.hits + self.misses
+        return {
+            "entries": entries,
+            "bytes": total,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
+
+
+_caches = {}
+_caches_lock = threading.Lock()
+
+
+def _shared_cache(table, ttl_env, ttl_default, mb_env, mb_default):
+    with _caches_lock:
+        if table not in _caches:
+            _caches[table] = DiskCache(
+                os.path.join(CACHE_DIR, "cache.sqlite3"),
+                table=table,
+                ttl=float(os.environ.get(ttl_env, ttl_default)),
+                max_bytes=int(float(os.environ.get(mb_env, mb_default)) * 1024 * 1024),
+            )
+        return _caches[table]
+
+
+def get_transcript_cache():
+    return _shared_cache(
+        "transcripts",
+        "CHEF_TRANSCRIPT_CACHE_TTL", 7 * 24 * 3600,
+        "CHEF_TRANSCRIPT_CACHE_MB", 64,
+    )
+
+
+def cached_transcript(url, fetch):
+    """Return the transcript for `url`, calling `fetch(url)` only on a miss.
+
+    Error strings from the fetchers are passed through but never stored, so a
+    flaky download is retried on the next click.
+    """
+    cache = get_transcript_cache()
+    with metrics.span("url_parse"):
+        key = canonical_video_key(url)
+    text = cache.get(key)
+    if text is not None:
+        return text
+    text = fetch(url)
+    if text and "Error" not in text:
+        cache.set(key, text)
+    return text
+
+
+def get_caption_cache():
+    return _shared_cache(
+        "caption_tracks",
+        "CHEF_CAPTION_CACHE_TTL", 6 * 3600,
+        "CHEF_CAPTION_CACHE_MB", 8,
+    )
+
+
+# Signed caption URLs are dropped this long before their expire= time, so a
+# track list is never handed out just as its URLs stop working
+EXPIRY_MARGIN = 120
+
+
+def url_expiry(url):
+    """The expire= timestamp of a signed YouTube URL, or None."""
+    values = urllib.parse.parse_qs(urllib.parse.urlsplit(url).query).get("expire")
+    try:
+        return float(values[0]) if values else None
+    except ValueError:
+        return None
+
+
+def cached_caption_tracks(url, probe):
+    """Caption track list for `url`, calling `probe(url)` only on a miss.
+
+    Entries live until the earliest expire= among their track URLs (or the
+    table TTL when the URLs carry none), so a re-extraction with another
+    prompt or model skips the yt-dlp page probe.
+    """
+    cache = get_caption_cache()
+    key = canonical_video_key(url)
+    raw = cache.get(key)
+    if raw is not None:
+        entry = json.loads(raw)
+        if entry["expires"] is None or entry["expires"] - EXPIRY_MARGIN > time.time():
+            return entry["captions"]
+    captions = probe(url)
+    if captions:
+        expiries = [
+            expiry for tracks in captions.values() for track in tracks
+            if (expiry := url_expiry(track["url"])) is not None
+        ]
+        cache.set(key, json.dumps({"expires": min(expiries, default=None), "captions": captions}))
+    return captions
+
+
+def forget_caption_tracks(url):
+    """Drop the cached track list, e.g. after its URLs started failing."""
+    get_caption_cache().delete(canonical_video_key(url))
+
+
+def get_recipe_cache():
+    return _shared_cache(
+        "recipes",
+        "CHEF_RECIPE_CACHE_TTL", 30 * 24 * 3600,
+        "CHEF_RECIPE_CACHE_MB", 32,
+    )
+
+
+def recipe_cache_key(transcript_text, prompt_version, model_name):
+    """Content hash of everything that decides what Gemini sends back."""
+    normalized = " ".join(transcript_text.split())
+    digest = hashlib.sha256()
+    for part in (normalized, str(prompt_version), model_name):
+        digest.update(part.encode("utf-8"))
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+def get_cached_recipe(key):
+    raw = get_recipe_cache().get(key)
+    return json.loads(raw) if raw is not None else None
+
+
+def store_recipe(key, recipe):
+    get_recipe_cache().set(key, json.dumps(recipe))
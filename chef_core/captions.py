@@ -0,0 +1,157 @@
+"""One parser for every caption format we download.
+
+json3, srv1/srv3 XML, WebVTT and SRT are reduced to cue lines with a few
+whole-string regex passes, so no JSON tree or per-segment dicts are built.
+The lines feed a RollingJoiner, which collapses the rolling duplicates in
+auto-captions, where each cue repeats the tail of the previous one.
+"""
+import html
+import json
+import re
+
+MAX_OVERLAP_WORDS = 40
+MIN_OVERLAP_WORDS = 2
+
+_JSON3_UTF8 = re.compile(r'"utf8"\s*:\s*"([^"\\]*(?:\\.[^"\\]*)*)"')
+_XML_CUE_END = re.compile(r"</(?:p|text)>")
+_TAG = re.compile(r"<[^>]+>")
+_VTT_BLOCK = re.compile(r"^(?:NOTE|STYLE|REGION)\b.*?(?:\n[ \t]*\n|\Z)", re.M | re.S)
+# A cue identifier is the line between the blank line and the timing line
+_VTT_CUE_ID = re.compile(r"\n\n[^\n]+\n(?=[^\n]*-->)")
+
+
+class RollingJoiner:
+    """Builds transcript text from cue lines, dropping re-sent overlap.
+
+    A cue that starts with the last words already emitted only contributes
+    the words after that overlap, and a cue that is entirely a repeat of the
+    tail contributes nothing.
+    """
+
+    def __init__(self):
+        self.words = []
+        self.dropped = 0
+        self._last = None
+
+    def add(self, line):
+        new = line.split()
+        if not new:
+            return
+        if new == self._last:
+            # Rolling captions re-send the previous cue verbatim all the time
+            self.dropped += len(new)
+            return
+        self._last = new
+        words = self.words
+        # Any overlap ends on the last word emitted, so most cues of captions
+        # that don't roll are settled by this one membership test
+        if words and words[-1] in new:
+            n = len(words)
+            # Candidate overlaps start wherever new[0] occurs in the tail; the
+            # earliest one is the longest overlap, which is the one we want.
+            i = max(0, n - MAX_OVERLAP_WORDS)
+            first = new[0]
+            while True:
+                try:
+                    i = words.index(first, i, n)
+                except ValueError:
+                    break
+                k = n - i
+                if (k <= len(new) and new[k - 1] == words[-1]
+                        and (k >= MIN_OVERLAP_WORDS or k == len(new)) and words[i:] == new[:k]):
+                    self.dropped += k
+                    new = new[k:]
+                    break
+                i += 1
+        words.extend(new)
+
+    def text(self):
+        return " ".join(self.words)
+
+
+def join_caption_lines(lines):
+    joiner = RollingJoiner()
+    for line in lines:
+        joiner.add(line)
+    return joiner.text()
+
+
+def iter_json3(payload):
+    """Cue lines of a json3 payload: the utf8 segs of each event, concatenated."""
+    for event in payload.split('"tStartMs"'):
+        segs = _JSON3_UTF8.findall(event)
+        if segs:
+            line = "".join(segs)
+            yield json.loads(f'"{line}"') if "\\" in line else line
+
+
+def _strip_markup(text):
+    if "<" in text:
+        text = _TAG.sub(" ", text)
+    if "&" in text:
+        text = html.unescape(text)
+        # Old timedtext payloads double-escape apostrophes (&amp;#39;)
+        if "&" in text:
+            text = html.unescape(text)
+    return text
+
+
+def iter_xml(payload):
+    # Every </p> (srv3) or </text> (srv1) closes a cue, so turn those into
+    # line breaks and strip everything else in whole-string passes.
+    return _strip_markup(_XML_CUE_END.sub("\n", payload)).splitlines()
+
+
+def iter_vtt(payload):
+    if "\r" in payload:
+        payload = payload.replace("\r\n", "\n").replace("\r", "\n")
+    header_end = payload.find("\n\n")
+    body = payload[header_end:] if header_end >= 0 else ""
+    if "NOTE" in body or "STYLE" in body or "REGION" in body:
+        body = _VTT_BLOCK.sub("", body)
+    body = _VTT_CUE_ID.sub("\n\n", body)
+    return [line for line in _strip_markup(body).splitlines() if "-->" not in line]
+
+
+def iter_srt(payload):
+    return [
+        line for line in _strip_markup(payload).splitlines()
+        if "-->" not in line and not line.strip().isdigit()
+    ]
+
+
+PARSERS = {
+    "json3": iter_json3,
+    "xml": iter_xml,
+    "srv1": iter_xml,
+    "srv2": iter_xml,
+    "srv3": iter_xml,
+    "ttml": iter_xml,
+    "vtt": iter_vtt,
+    "srt": iter_srt,
+}
+
+
+def sniff_format(payload):
+    head = payload[:200].lstrip("﻿ \t\r\n")
+    if head.startswith("{"):
+        return "json3"
+    if head.startswith("WEBVTT"):
+        return "vtt"
+    if head.startswith("<"):
+        return "xml"
+    if "-->" in payload[:500]:
+        return "srt"
+    return None
+
+
+def parse_captions(payload, fmt=None):
+    """Plain transcript text from a caption file in any supported format.
+
+    `fmt` is the yt-dlp extension when known, otherwise it is sniffed.
+    Unrecognised payloads are returned as-is.
+    """
+    parser = PARSERS.get(fmt) or PARSERS.get(sniff_format(payload))
+    if parser is None:
+        return payload
+    return join_caption_lines(parser(payload))
@@ -0,0 +1,119 @@
+"""Lazily imported, process-wide handles on the heavy client libraries.
+
+google.generativeai, yt_dlp and youtube_transcript_api together take close
+to a second to import. Streamlit re-executes the page script on every
+interaction, so nothing at module level should pull them in. Everything in
+chef_core reaches them through these accessors instead, which import on
+first use and then keep the result for the life of the process.
+"""
+import contextvars
+import functools
+import importlib.util
+
+
+def is_installed(module):
+    """Cheap availability check that doesn't import the module."""
+    try:
+        return importlib.util.find_spec(module) is not None
+    except (ImportError, ValueError):
+        return False
+
+
+@functools.lru_cache(maxsize=None)
+def genai():
+    import google.generativeai
+
+    return google.generativeai
+
+
+@functools.lru_cache(maxsize=None)
+def not_found_error():
+    from google.api_core.exceptions import NotFound
+
+    return NotFound
+
+
+@functools.lru_cache(maxsize=None)
+def invalid_argument_error():
+    from google.api_core.exceptions import InvalidArgument
+
+    return InvalidArgument
+
+
+@functools.lru_cache(maxsize=None)
+def youtube_dl_class():
+    from yt_dlp import YoutubeDL
+
+    return YoutubeDL
+
+
+def _timeout_session():
+    """requests.Session that gives every request the transcript stage's timeout."""
+    import requests
+
+    from chef_core import deadline
+
+    class TimeoutSession(requests.Session):
+        def request(self, *args, **kwargs):
+            kwargs.setdefault("timeout", deadline.timeout("transcript"))
+            return super().request(*args, **kwargs)
+
+    return TimeoutSession()
+
+
+@functools.lru_cache(maxsize=None)
+def transcript_api():
+    """YouTubeTranscriptApi instance, or None if the library is missing."""
+    try:
+        from youtube_transcript_api import YouTubeTranscriptApi
+    except ImportError:
+        return None
+    try:
+        return YouTubeTranscriptApi(http_client=_timeout_session())
+    except TypeError:
+        # Before 1.0 there was no http_client, nor an instance API to pass it to
+        return YouTubeTranscriptApi()
+
+
+def fetch_youtube_transcript(video_id):
+    """Caption lines for a video via youtube-transcript-api.
+
+    Works with both the old classmethod API (get_transcript, < 1.0) and the
+    instance API (fetch, >= 1.0).
+    """
+    api = transcript_api()
+    if api is None:
+        raise ImportError("youtube-transcript-api is not installed")
+    if hasattr(api, "fetch"):
+        return [snippet.text for snippet in api.fetch(video_id)]
+    return [entry['text'] for entry in type(api).get_transcript(video_id)]
+
+
+@functools.lru_cache(maxsize=None)
+def pytube_class():
+    from pytubefix import YouTube
+
+    return YouTube
+
+
+_api_key = None
+# Each Streamlit session configures its own key on its own thread, and
+# metrics.in_context() carries it into pool threads
+_context_key = contextvars.ContextVar("chef_api_key", default=None)
+
+
+def configure(api_key):
+    global _api_key
+    genai().configure(api_key=api_key)
+    _api_key = api_key
+    _context_key.set(api_key)
+
+
+def configured_key():
+    """The key this context last passed to configure(), else the last one
+    configured anywhere in the process, or None."""
+    return _context_key.get() or _api_key
+
+
+def generative_model(model_name):
+    return genai().GenerativeModel(model_name)
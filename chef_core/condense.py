@@ -0,0 +1,118 @@
+"""Shrink long transcripts to their most recipe-like windows instead of
+blindly keeping the first N characters."""
+import re
+
+CHARS_PER_TOKEN = 4          # rough English average for Gemini's tokenizer
+WINDOW_WORDS = 40
+RECIPE_MAX_TOKENS = 3000     # full recipe prompt (steps + ingredients)
+INGREDIENTS_MAX_TOKENS = 2000  # ingredient-list-only prompts
+
+NUMBER_WORDS = frozenset(
+    "one two three four five six seven eight nine ten eleven twelve fifteen twenty "
+    "thirty forty fifty hundred half quarter third dozen couple few pinch dash handful "
+    "splash".split()
+)
+UNITS = frozenset(
+    "cup cups c tablespoon tablespoons tbsp tbs tbsps teaspoon teaspoons tsp tsps "
+    "ounce ounces oz pound pounds lb lbs gram grams g kg kilo kilos kilogram "
+    "kilograms ml milliliter milliliters millilitres l liter liters litre litres pint "
+    "pints quart quarts gallon gallons stick sticks clove cloves can cans jar jars "
+    "package packages pack slice slices bunch bunches sprig sprigs head heads piece "
+    "pieces inch inches degrees fahrenheit celsius minute minutes min mins hour hours "
+    "second seconds".split()
+)
+FOOD_WORDS = frozenset(
+    "flour sugar salt pepper butter oil olive egg eggs milk cream cheese parmesan "
+    "mozzarella cheddar garlic onion onions shallot shallots ginger tomato tomatoes "
+    "potato potatoes carrot carrots celery chicken beef pork lamb bacon sausage fish "
+    "salmon shrimp tuna tofu rice pasta spaghetti noodles bread dough yeast water stock "
+    "broth wine vinegar lemon lime juice zest honey syrup maple chocolate cocoa vanilla "
+    "cinnamon cumin paprika chili chilli oregano basil thyme rosemary parsley cilantro "
+    "coriander mint dill bay soy sauce mustard mayo mayonnaise ketchup yogurt beans "
+    "chickpeas lentils corn peas spinach kale lettuce cabbage broccoli cauliflower "
+    "mushroom mushrooms pepper peppers bell jalapeno avocado cucumber zucchini eggplant "
+    "apple apples banana bananas berries strawberries blueberries nuts almonds walnuts "
+    "peanut peanuts sesame seeds coconut oats cornstarch baking soda powder".split()
+)
+COOKING_VERBS = frozenset(
+    "add mix stir whisk combine chop dice mince slice cut peel grate fold knead roll "
+    "bake roast fry saute sear boil simmer steam grill broil toast melt pour season "
+    "sprinkle drizzle marinate blend beat heat preheat cook reduce drain rinse toss "
+    "serve garnish cover rest chill freeze spread layer transfer flip brown caramelize "
+    "shred crush squeeze measure".split()
+)
+
+_DIGIT = re.compile(r"^\d+(?:[.,/]\d+)?(?:st|nd|rd|th|g|ml|oz|lb|kg)?$")
+_FRACTIONS = frozenset("½⅓⅔¼¾⅛")
+_STRIP = ".,!?;:\"'()[]"
+
+
+def _word_score(word):
+    w = word.lower().strip(_STRIP)
+    if not w:
+        return 0.0
+    if _DIGIT.match(w) or w[0] in _FRACTIONS:
+        return 2.0
+    if w in UNITS:
+        return 2.0
+    if w in FOOD_WORDS:
+        return 1.5
+    if w in COOKING_VERBS:
+        return 1.0
+    if w in NUMBER_WORDS:
+        return 0.5
+    return 0.0
+
+
+def score_windows(words, window=WINDOW_WORDS):
+    scores = []
+    for start in range(0, len(words), window):
+        chunk = words[start:start + window]
+        scores.append(sum(_word_score(w) for w in chunk) / len(chunk))
+    # Ingredient lists and method steps run across window edges, so let a
+    # window borrow some relevance from its neighbours.
+    smoothed = []
+    for i, s in enumerate(scores):
+        left = scores[i - 1] if i > 0 else 0.0
+        right = scores[i + 1] if i + 1 < len(scores) else 0.0
+        smoothed.append(s + 0.25 * (left + right))
+    return smoothed
+
+
+def condense_transcript(text, max_tokens=RECIPE_MAX_TOKENS):
+    """Return `text` unchanged if it fits, else its most recipe-like windows.
+
+    Windows with nothing recipe-like in them are dropped even when there is
+    budget left. Skipped stretches are marked with "..." so the model knows
+    the text jumps.
+    """
+    budget = max_tokens * CHARS_PER_TOKEN
+    if len(text) <= budget:
+        return text
+
+    words = text.split()
+    windows = [" ".join(words[i:i + WINDOW_WORDS]) for i in range(0, len(words), WINDOW_WORDS)]
+    scores = score_windows(words)
+
+    chosen = set()
+    used = 0
+    for i in sorted(range(len(windows)), key=lambda i: scores[i], reverse=True):
+        if scores[i] <= 0:
+            break  # Pure chatter, no point paying for it
+        cost = len(windows[i]) + 5
+        if used + cost > budget:
+            continue
+        chosen.add(i)
+        used += cost
+
+    if not chosen:
+        return text[:budget]
+
+    out = []
+    previous = -1
+    for i in sorted(chosen):
+        if previous >= 0 and i != previous + 1:
+            out.append("...")
+        out.append(windows[i])
+        previous = i
+    return " ".join(out)
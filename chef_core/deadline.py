@@ -0,0 +1,126 @@
+"""One deadline per request, split into per-stage budgets.
+
+A page or API job wraps its work in budget(), which puts an absolute
+deadline (CHEF_DEADLINE seconds, 20 by default) in a context variable; pool
+threads started through metrics.in_context() inherit it. Every network call
+asks timeout(stage) for its limit: the stage's own cap from STAGE_BUDGETS
+(overridable as CHEF_DEADLINE_<STAGE>), cut down to whatever is left of the
+deadline. Outside budget() the caps alone apply, so nothing waits forever.
+
+Once the deadline has passed, timeout() and check() raise DeadlineExpired,
+a TimeoutError, and every timeout is counted as timeouts{stage}. Callers
+catch it (is_timeout() also recognises the requests, socket and api_core
+flavours, even wrapped in another error the way yt-dlp wraps them) and
+show what they have instead of a stuck spinner.
+"""
+import contextlib
+import contextvars
+import os
+import time
+
+from chef_core import metrics
+
+TOTAL = float(os.environ.get("CHEF_DEADLINE", 20))
+
+# Longest a single call in each stage may take, however much time is left
+STAGE_BUDGETS = {
+    stage: float(os.environ.get(f"CHEF_DEADLINE_{stage.upper()}", default))
+    for stage, default in {
+        "transcript": 8.0,      # a whole strategy race, or one yt-dlp socket operation
+        "captions": 5.0,        # one caption file download
+        "model": 3.0,           # list_models()
+        "llm": 15.0,            # one generate_content() call
+    }.items()
+}
+
+# Exception class names that mean "took too long" in the libraries we call
+_TIMEOUT_NAMES = frozenset({
+    "Timeout", "ReadTimeout", "ConnectTimeout", "ReadTimeoutError", "ConnectTimeoutError",
+    "DeadlineExceeded", "GatewayTimeout",
+})
+
+_expires = contextvars.ContextVar("chef_deadline", default=None)
+
+
+class DeadlineExpired(TimeoutError):
+    def __init__(self, stage):
+        super().__init__(f"Ran out of time during {stage}.")
+        self.stage = stage
+
+
+@contextlib.contextmanager
+def budget(seconds=None):
+    """Run the block under a deadline `seconds` (default TOTAL) from now.
+    A nested budget() can only shorten the deadline, never extend it."""
+    expires = time.monotonic() + (TOTAL if seconds is None else seconds)
+    outer = _expires.get()
+    token = _expires.set(expires if outer is None else min(outer, expires))
+    try:
+        yield
+    finally:
+        _expires.reset(token)
+
+
+def remaining():
+    """Seconds left before the deadline, or None outside budget()."""
+    expires = _expires.get()
+    return None if expires is None else max(0.0, expires - time.monotonic())
+
+
+def record(stage):
+    metrics.incr("timeouts", stage=stage)
+
+
+def check(stage):
+    """Raise DeadlineExpired if the deadline has already passed."""
+    if remaining() == 0.0:
+        record(stage)
+        raise DeadlineExpired(stage)
+
+
+def timeout(stage):
+    """Seconds the next call in `stage` may take."""
+    check(stage)
+    left = remaining()
+    cap = STAGE_BUDGETS[stage]
+    return cap if left is None else min(cap, left)
+
+
+def _wrapped(exc):
+    # yt-dlp's DownloadError/ExtractorError keep the original in exc_info
+    # (and ExtractorError in cause) rather than always chaining it
+    exc_info = getattr(exc, "exc_info", None)
+    if isinstance(exc_info, tuple) and len(exc_info) > 1:
+        yield exc_info[1]
+    yield getattr(exc, "cause", None)
+    yield exc.__cause__
+    yield exc.__context__
+
+
+def is_timeout(exc):
+    """True if `exc`, or any error it wraps, means something took too long."""
+    pending, seen = [exc], set()
+    while pending:
+        exc = pending.pop()
+        if not isinstance(exc, BaseException) or id(exc) in seen:
+            continue
+        seen.add(id(exc))
+        if isinstance(exc, TimeoutError) or any(cls.__name__ in _TIMEOUT_NAMES for cls in type(exc).__mro__):
+            return True
+        pending.extend(_wrapped(exc))
+    return False
+
+
+@contextlib.contextmanager
+def guard(stage):
+    """Turn any timeout escaping the block into DeadlineExpired(stage),
+    counting it once."""
+    try:
+        yield
+    except DeadlineExpired:
+        raise
+    except Exception as e:
+        if not is_timeout(e):
+            raise
+        record(stage)
+        raise DeadlineExpired(stage) from e
@@ -0,0 +1,172 @@
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from urllib.parse import urlsplit
+
+from chef_core import metrics
+
+DEFAULT_HEDGE_DELAY = 1.0   # seconds, until we have latency numbers for a host
+MIN_HEDGE_DELAY = 0.25
+MAX_HEDGE_DELAY = 4.0
+EWMA_ALPHA = 0.2
+BREAKER_THRESHOLD = 3       # consecutive failures before a strategy is skipped
+BREAKER_COOLDOWN = 60.0     # seconds before a tripped strategy gets one trial call
+
+
+def host_family(url):
+    host = urlsplit(url).netloc.lower()
+    if "youtube.com" in host or "youtu.be" in host:
+        return "youtube"
+    if "instagram.com" in host:
+        return "instagram"
+    if "tiktok.com" in host:
+        return "tiktok"
+    return "other"
+
+
+class StrategyStats:
+    """Running success rate, latency and circuit-breaker state for one
+    (host family, strategy) pair."""
+
+    def __init__(self):
+        self.latency = None     # EWMA of successful call latency
+        self.deviation = 0.0    # EWMA of |latency - mean|
+        self.success_rate = 1.0
+        self.calls = 0
+        self.consecutive_failures = 0
+        self.open_until = 0.0
+
+    def record(self, ok, elapsed, now):
+        self.calls += 1
+        self.success_rate += EWMA_ALPHA * ((1.0 if ok else 0.0) - self.success_rate)
+        if ok:
+            if self.latency is None:
+                self.latency = elapsed
+            else:
+                self.deviation += EWMA_ALPHA * (abs(elapsed - self.latency) - self.deviation)
+                self.latency += EWMA_ALPHA * (elapsed - self.latency)
+            self.consecutive_failures = 0
+            self.open_until = 0.0
+        else:
+            self.consecutive_failures += 1
+            if self.consecutive_failures >= BREAKER_THRESHOLD:
+                self.open_until = now + BREAKER_COOLDOWN
+
+    def is_open(self, now):
+        return now < self.open_until
+
+    def cost(self):
+        """Expected seconds to a good transcript; lower goes first."""
+        latency = self.latency if self.latency is not None else DEFAULT_HEDGE_DELAY
+        return latency / max(self.success_rate, 0.05)
+
+    def hedge_delay(self):
+        if self.latency is None:
+            return DEFAULT_HEDGE_DELAY
+        if self.success_rate < 0.5:
+            return MIN_HEDGE_DELAY  # Usually fails, don't make the backup wait on it
+        return min(max(self.latency + 2 * self.deviation, MIN_HEDGE_DELAY), MAX_HEDGE_DELAY)
+
+
+class HedgedRunner:
+    """Races transcript strategies: the best-ranked one starts immediately, the
+    next one after an adaptive hedge delay, and the first valid result wins.
+
+    Threads can't be killed, so a losing call that already started is left to
+    finish in the background; its result is dropped but still feeds the stats.
+    """
+
+    def __init__(self, max_workers=16):
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="transcript")
+        self._lock = threading.Lock()
+        self._stats = {}
+
+    def stats_for(self, family, name):
+        with self._lock:
+            return self._stats.setdefault((family, name), StrategyStats())
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                f"{family}/{name}": {
+                    "latency": s.latency,
+                    "success_rate": round(s.success_rate, 3),
+                    "calls": s.calls,
+                    "open": s.is_open(time.monotonic()),
+                }
+                for (family, name), s in self._stats.items()
+            }
+
+    def plan(self, url, strategies):
+        """Order `strategies` ((name, fn) pairs) for this URL's host, skipping
+        any whose breaker is open unless that would leave nothing to try."""
+        family = host_family(url)
+        now = time.monotonic()
+        with self._lock:
+            ranked = sorted(
+                strategies,
+                key=lambda s: self._stats.setdefault((family, s[0]), StrategyStats()).cost(),
+            )
+            closed = [s for s in ranked if not self._stats[(family, s[0])].is_open(now)]
+        return family, closed or ranked
+
+    def run(self, url, strategies, is_valid, timeout=None):
+        """Return the first result accepted by `is_valid`, else the last
+        rejected result (None if every strategy raised).
+
+        Raises TimeoutError if nothing valid came back within `timeout`
+        seconds; strategies not yet started by then are cancelled.
+        """
+        ends = None if timeout is None else time.monotonic() + timeout
+        family, ordered = self.plan(url, strategies)
+        queue = list(ordered)
+        pending = {}
+        last_result = None
+
+        def launch():
+            name, fn = queue.pop(0)
+            started = time.monotonic()
+
+            def record(future):
+                if future.cancelled():
+                    return
+                ok = future.exception() is None and is_valid(future.result())
+                self._record(family, name, ok, time.monotonic() - started)
+                metrics.incr("strategy_results", strategy=name, result="ok" if ok else "failed")
+
+            if len(queue) < len(ordered) - 1:
+                # Not the first pick, so the hedge timer fired or an earlier strategy failed
+                metrics.incr("fallbacks", kind="hedge", strategy=name)
+            future = self._pool.submit(metrics.in_context(fn), url)
+            future.add_done_callback(record)
+            pending[future] = name
+            return name
+
+        newest = launch()
+        while pending:
+            delay = self.stats_for(family, newest).hedge_delay() if queue else None
+            if ends is not None:
+                left = ends - time.monotonic()
+                if left <= 0:
+                    for future in pending:
+                        future.cancel()
+                    raise TimeoutError(f"no transcript within {timeout:.1f}s")
+                delay = left if delay is None else min(delay, left)
+            done, _ = wait(pending, timeout=delay, return_when=FIRST_COMPLETED)
+            for future in done:
+                pending.pop(future)
+                if future.exception() is None:
+                    result = future.result()
+                    if is_valid(result):
+                        for loser in pending:
+                            loser.cancel()
+                        return result
+                    last_result = result
+            # Either the hedge timer fired or a strategy failed: start the next one now
+            if queue:
+                newest = launch()
+        return last_result
+
+    def _record(self, family, name, ok, elapsed):
+        with self._lock:
+            self._stats.setdefault((family, name), StrategyStats()).record(ok, elapsed, time.monotonic())
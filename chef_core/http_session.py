@@ -0,0 +1,55 @@
+import threading
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util import make_headers
+
+POOL_HOSTS = 16        # distinct hosts kept warm (caption hosts, googlevideo, CDNs)
+POOL_PER_HOST = 32     # keep-alive connections per host, sized for the batch pools
+
+_session = None
+_session_lock = threading.Lock()
+_requests_sent = 0
+
+
+def _count_request(response, *args, **kwargs):
+    global _requests_sent
+    with _session_lock:
+        _requests_sent += 1
+
+
+def get_session():
+    """Process-wide keep-alive session for caption downloads.
+
+    Every transcript strategy and the batch CLI share it, so repeat requests to
+    the same caption host skip the TCP + TLS handshake. Accept-Encoding lists
+    br only when a brotli decoder is installed.
+    """
+    global _session
+    with _session_lock:
+        if _session is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=POOL_HOSTS, pool_maxsize=POOL_PER_HOST)
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+            session.headers.update(make_headers(accept_encoding=True))
+            session.hooks["response"].append(_count_request)
+            _session = session
+        return _session
+
+
+def connection_stats():
+    """How many requests went out vs. how many connections had to be opened."""
+    connections = 0
+    if _session is not None:
+        for adapter in set(_session.adapters.values()):
+            pools = adapter.poolmanager.pools
+            for key in list(pools.keys()):
+                pool = pools.get(key)
+                if pool is not None:
+                    connections += pool.num_connections
+    return {
+        "requests": _requests_sent,
+        "connections": connections,
+        "reused": max(_requests_sent - connections, 0),
+    }
@@ -0,0 +1,299 @@
+"""Rule-based ingredient extraction, tried before asking Gemini.
+
+Plenty of cooking videos say their quantities out loud ("two tablespoons of
+olive oil", "12 oz spaghetti"). For those we can build the shopping list
+locally: every food term in the transcript is found with one precompiled
+alternation (longest terms first, so "olive oil" beats "oil"), and the words
+right before it are matched against a quantity/unit pattern.
+
+The confidence is the share of distinct foods mentioned that ended up with a
+quantity, scaled down when only a handful of items were found. A measured
+amount of something outside our vocabulary ("3 tbsp of harissa") is an item
+we would leave off, so it drops the confidence to 0. Below MIN_CONFIDENCE
+the caller should fall back to the LLM, which can also estimate the
+quantities the video never states; above it, foods mentioned without a
+quantity still go on the list, by name only.
+"""
+import os
+import re
+
+from chef_core import metrics
+from chef_core.condense import FOOD_WORDS
+
+MIN_CONFIDENCE = float(os.environ.get("CHEF_LOCAL_INGREDIENTS_CONFIDENCE", 0.8))
+MIN_ITEMS = 4
+
+MULTIWORD_FOODS = (
+    "olive oil", "vegetable oil", "canola oil", "sesame oil", "coconut oil", "coconut milk",
+    "heavy cream", "heavy whipping cream", "sour cream", "cream cheese", "whipping cream",
+    "brown sugar", "powdered sugar", "icing sugar", "caster sugar", "baking soda",
+    "baking powder", "soy sauce", "fish sauce", "hot sauce", "oyster sauce", "tomato paste",
+    "tomato sauce", "chicken breast", "chicken breasts", "chicken thighs", "chicken broth",
+    "chicken stock", "beef broth", "beef stock", "vegetable broth", "vegetable stock",
+    "ground beef", "ground pork", "ground turkey", "white wine", "red wine",
+    "red pepper flakes", "chili flakes", "chilli flakes", "black pepper", "white pepper",
+    "cayenne pepper", "bell pepper", "bell peppers", "green onion", "green onions",
+    "spring onion", "spring onions", "red onion", "yellow onion", "bay leaf", "bay leaves",
+    "lemon juice", "lime juice", "lemon zest", "lime zest", "parmesan cheese",
+    "cheddar cheese", "feta cheese", "maple syrup", "vanilla extract", "all purpose flour",
+    "all-purpose flour", "bread flour", "egg yolk", "egg yolks", "egg whites",
+    "sesame seeds", "cherry tomatoes", "sweet potato", "sweet potatoes", "rice vinegar",
+    "apple cider vinegar", "balsamic vinegar", "white vinegar", "dijon mustard",
+    "peanut butter", "garlic powder", "onion powder", "chili powder", "smoked paprika",
+    "chocolate chips", "bread crumbs", "curry powder", "garam masala",
+)
+EXTRA_FOODS = (
+    "linguine penne fettuccine macaroni rigatoni ramen breadcrumbs panko feta ricotta "
+    "scallions scallion leek leeks chives turmeric nutmeg cayenne sriracha tortillas "
+    "tortilla buttermilk cornmeal shallot flank steak thighs wings anchovies capers olives "
+    "pecans cashews pistachios raisins quinoa couscous gnocchi lasagna mascarpone gruyere "
+    "brie pancetta prosciutto chorizo ham turkey cod halibut scallops mussels clams "
+    "tahini miso arugula"
+).split()
+# Not shopping items even though they look like food in a transcript
+IGNORED_FOODS = (
+    "water", "pasta water", "cooking water", "boiling water", "ice water", "warm water",
+    "cold water", "hot water",
+)
+# Too vague on their own to say one mention covers another ("oil", "sauce")
+_GENERIC = frozenset(
+    "oil sauce cheese pepper peppers powder juice zest wine broth stock cream sugar "
+    "vinegar flour seeds flakes milk".split()
+)
+# Kinds of food, usually naming something already on the list ("cook the pasta")
+_CATEGORIES = frozenset("pasta noodles meat fish seafood cheese herbs spices greens vegetables veggies".split())
+_AMBIGUOUS = frozenset("bell bay soda powder baking juice zest sauce seeds water dough olive".split())
+
+NUMBERS = {
+    "one": 1, "two": 2, "three": 3, "four": 4, "five": 5, "six": 6, "seven": 7,
+    "eight": 8, "nine": 9, "ten": 10, "eleven": 11, "twelve": 12, "fifteen": 15,
+    "sixteen": 16, "twenty": 20, "thirty": 30, "forty": 40, "fifty": 50, "dozen": 12,
+}
+FRACTION_CHARS = {"½": "1/2", "⅓": "1/3", "⅔": "2/3", "¼": "1/4", "¾": "3/4", "⅛": "1/8"}
+UNIT_NAMES = {
+    "tablespoon": "tbsp", "tablespoons": "tbsp", "tbsp": "tbsp", "tbsps": "tbsp", "tbs": "tbsp",
+    "teaspoon": "tsp", "teaspoons": "tsp", "tsp": "tsp", "tsps": "tsp",
+    "ounce": "oz", "ounces": "oz", "oz": "oz",
+    "pound": "lb", "pounds": "lb", "lb": "lb", "lbs": "lb",
+    "gram": "g", "grams": "g", "g": "g", "kilogram": "kg", "kilograms": "kg", "kg": "kg",
+    "milliliter": "ml", "milliliters": "ml", "millilitres": "ml", "ml": "ml",
+    "liter": "liter", "liters": "liter", "litre": "liter", "litres": "liter",
+    "cup": "cup", "cups": "cup", "pint": "pint", "pints": "pint", "quart": "quart", "quarts": "quart",
+    "clove": "clove", "cloves": "clove", "can": "can", "cans": "can", "jar": "jar", "jars": "jar",
+    "stick": "stick", "sticks": "stick", "slice": "slice", "slices": "slice",
+    "bunch": "bunch", "bunches": "bunch", "sprig": "sprig", "sprigs": "sprig",
+    "head": "head", "heads": "head", "piece": "piece", "pieces": "piece",
+    "package": "package", "packages": "package", "pack": "package",
+    "handful": "handful", "handfuls": "handful", "pinch": "pinch", "pinches": "pinch",
+    "dash": "dash", "dashes": "dash", "splash": "splash",
+}
+# Abbreviations stay singular ("2 tbsp"), everything else is pluralised
+_PLURALS = {"bunch": "bunches", "pinch": "pinches", "dash": "dashes", "splash": "splashes"}
+_ABBREVIATED = frozenset("tbsp tsp oz lb g kg ml".split())
+MODIFIERS = (
+    "small large big medium heaping heaped level generous good fresh dried dry ground "
+    "grated shredded chopped minced diced sliced crushed whole boneless skinless unsalted "
+    "salted raw cooked frozen ripe extra virgin plain light dark packed softened melted "
+    "cold warm room temperature finely roughly freshly reserved"
+).split()
+
+
+def _alternation(words):
+    # Longest first, so the regex engine prefers "olive oil" over "olive"
+    return "|".join(re.escape(w) for w in sorted(set(words), key=len, reverse=True))
+
+
+_FOODS = frozenset(MULTIWORD_FOODS) | (FOOD_WORDS - _AMBIGUOUS) | frozenset(EXTRA_FOODS)
+_FOOD_RE = re.compile(rf"\b(?:{_alternation(_FOODS | frozenset(IGNORED_FOODS))})\b")
+_QTY = (
+    r"\d+(?:\s+\d+/\d+|[./]\d+)?|[½⅓⅔¼¾⅛]"
+    r"|(?:a|one)\s+(?:quarter|third|half)(?:\s+of)?(?:\s+an?)?"
+    r"|half(?:\s+an?)?|a\s+couple(?:\s+of)?|a\s+few|a\s+dozen"
+    rf"|(?:{_alternation(NUMBERS)})(?:\s+and\s+a\s+half)?|an?"
+)
+_MOD = rf"(?:{_alternation(MODIFIERS)})"
+# Anchored at the end: the words immediately before a food mention
+_BEFORE_RE = re.compile(
+    rf"\b(?P<qty>{_QTY})\s+(?P<size>(?:{_MOD}\s+){{0,2}})(?:(?P<unit>{_alternation(UNIT_NAMES)})\s+)?"
+    rf"(?:of\s+)?(?P<mods>(?:(?:the|{_MOD})\s+){{0,3}})$"
+)
+_ITEM_RE = re.compile(
+    rf"^(?P<est>\(est\.?\)\s*)?(?P<qty>{_QTY})\s+(?:(?P<unit>{_alternation(UNIT_NAMES)})\.?\s+)?(?:of\s+)?(?=\S)"
+)
+_ALTERNATIVE_RE = re.compile(rf"\s+or\s+(?P<mods>(?:{_MOD}\s+){{0,2}})")
+# "<quantity> <unit> of <word>": a measured amount of *something*, food or not
+_MEASURED_RE = re.compile(
+    rf"\b(?:{_QTY})\s+(?:{_alternation(UNIT_NAMES)})\s+(?:of\s+)?(?:(?:the|{_MOD})\s+){{0,3}}(?P<word>[a-z][a-z'-]*)"
+)
+_NOT_FOOD = frozenset(
+    "it it's that that's this them those these some more each and or to in into for with on at "
+    "about per your my our you we i once when then so if until while because".split()
+)
+_LOOKBEHIND = 80
+
+
+def _quantity(text):
+    """(display string, numeric value or None) for a matched quantity."""
+    text = " ".join(text.split())
+    if text in FRACTION_CHARS:
+        return FRACTION_CHARS[text], _fraction(FRACTION_CHARS[text])
+    if text[0].isdigit():
+        whole, _, frac = text.partition(" ")
+        try:
+            value = float(whole) if "/" not in whole else _fraction(whole)
+            if frac:
+                value += _fraction(frac)
+        except (ValueError, ZeroDivisionError):
+            value = None
+        return text, value
+    words = text.split()
+    for word, fraction in (("half", "1/2"), ("third", "1/3"), ("quarter", "1/4")):
+        if word in words and "and" not in words:
+            return fraction, _fraction(fraction)
+    if words[0] in ("a", "an") and len(words) == 1:
+        return "1", 1.0
+    if words[:2] == ["a", "couple"]:
+        return "2", 2.0
+    if words[:2] == ["a", "dozen"]:
+        return "12", 12.0
+    if words[0] in NUMBERS:
+        value = float(NUMBERS[words[0]]) + (0.5 if "half" in words else 0)
+        return f"{value:g}" if value % 1 == 0 else f"{int(value)} 1/2", value
+    return text.capitalize(), None
+
+
+def _fraction(text):
+    top, bottom = text.split("/")
+    return int(top) / int(bottom)
+
+
+def _unit(unit, value):
+    name = UNIT_NAMES[unit]
+    if name in _ABBREVIATED or value is None or value <= 1:
+        return name
+    return _PLURALS.get(name, name + "s")
+
+
+def singular(word):
+    """'tomatoes' -> 'tomato', 'cherries' -> 'cherry', 'eggs' -> 'egg'."""
+    if word.endswith("oes"):
+        return word[:-2]
+    if word.endswith("ies"):
+        return word[:-3] + "y"
+    if word.endswith("s") and not word.endswith("ss"):
+        return word[:-1]
+    return word
+
+
+def _food_key(term):
+    # "2 eggs" and "1 egg" are one line on the list, so is "green onions"/"green onion"
+    words = term.split()
+    return " ".join(words[:-1] + [singular(words[-1])])
+
+
+def _covered(term, quantified_words):
+    words = [w for w in term.split() if w not in _GENERIC]
+    return any(singular(w) in quantified_words for w in words or term.split())
+
+
+def extract_ingredients(transcript_text):
+    """Quantified ingredients stated in the transcript.
+
+    Returns {"items": ["2 tbsp Olive oil", ...], "confidence": 0.0-1.0,
+    "unquantified": [food terms mentioned without any quantity],
+    "unrecognised": [words measured out that aren't in our vocabulary]}.
+    """
+    text = transcript_text.lower()
+    items = []
+    seen = set()
+    mentioned = []
+    for match in _FOOD_RE.finditer(text):
+        food = match.group(0)
+        if food in IGNORED_FOODS:
+            continue
+        before = _BEFORE_RE.search(text, max(0, match.start() - _LOOKBEHIND), match.start())
+        if before is None:
+            mentioned.append(food)
+            continue
+        unit = before.group("unit")
+        # "3 large eggs", but "a small handful of parsley" is about the handful
+        mods = before.group("mods") if unit else before.group("size") + before.group("mods")
+        name = (mods.replace("the ", "") + food).strip()
+        # "spaghetti or linguine" is one line on the list
+        alternative = _ALTERNATIVE_RE.match(text, match.end())
+        if alternative:
+            other = _FOOD_RE.match(text, alternative.end())
+            if other and other.group(0) not in IGNORED_FOODS:
+                name += f" or {alternative.group('mods')}{other.group(0)}"
+        key = _food_key(food)
+        if key in seen:
+            continue
+        seen.add(key)
+        qty, value = _quantity(before.group("qty"))
+        parts = [qty, _unit(unit, value)] if unit else [qty]
+        items.append(" ".join(parts + [name[:1].upper() + name[1:]]))
+
+    quantified_words = {singular(w) for w in " ".join(items).lower().split()}
+    unquantified = {}
+    for term in mentioned:
+        if not _covered(term, quantified_words):
+            unquantified.setdefault(_food_key(term), term)
+    unquantified = sorted(unquantified.values())
+    unrecognised = sorted({
+        m.group("word") for m in _MEASURED_RE.finditer(text)
+        # Vague words ("juice") belong to a food named elsewhere
+        if m.group("word") not in _NOT_FOOD | _AMBIGUOUS | _GENERIC and not _FOOD_RE.match(text, m.start("word"))
+    })
+    foods = len(seen) + len(unquantified)
+    coverage = len(seen) / foods if foods and not unrecognised else 0.0
+    confidence = coverage * min(1.0, len(items) / MIN_ITEMS)
+    return {
+        "items": items,
+        "confidence": round(confidence, 3),
+        "unquantified": unquantified,
+        "unrecognised": unrecognised,
+    }
+
+
+def local_ingredients(transcript_text, min_confidence=None):
+    """The extracted items if we trust them enough to skip Gemini, else None.
+
+    Foods the video mentions without a quantity ("top with parmesan") are
+    listed after the measured ones, by name only.
+    """
+    with metrics.span("ingredients/local"):
+        result = extract_ingredients(transcript_text)
+    threshold = MIN_CONFIDENCE if min_confidence is None else min_confidence
+    if result["confidence"] >= threshold:
+        metrics.incr("ingredient_source", source="local")
+        return result["items"] + [
+            food[:1].upper() + food[1:] for food in result["unquantified"] if food not in _CATEGORIES
+        ]
+    metrics.incr("ingredient_source", source="llm")
+    return None
+
+
+def parse_item(item):
+    """Split a "Quantity + Item" line, ours or Gemini's, into its parts.
+
+    Returns {"value": float or None, "unit": "tbsp" or None, "name": str,
+    "estimated": bool}. Lines without a leading quantity come back with
+    value None and the whole line as the name.
+    """
+    text = " ".join(item.split())
+    match = _ITEM_RE.match(text.lower())
+    if match is None:
+        estimated = text.lower().startswith("(est")
+        name = text.split(")", 1)[1].strip() if estimated and ")" in text else text
+        return {"value": None, "unit": None, "name": name, "estimated": estimated}
+    _, value = _quantity(match.group("qty"))
+    if value is None:
+        # "A few basil leaves": nothing to add up, keep the wording
+        return {"value": None, "unit": None, "name": text, "estimated": bool(match.group("est"))}
+    unit = match.group("unit")
+    return {
+        "value": value,
+        "unit": UNIT_NAMES[unit] if unit else None,
+        "name": text[match.end():],
+        "estimated": bool(match.group("est")),
+    }
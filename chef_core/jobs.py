@@ -0,0 +1,144 @@
+"""Recipe extraction as background jobs, for the headless API in api.py.
+
+submit() hands back a Job straight away and a bounded pool works through
+them. Jobs are deduplicated on canonical_video_key(): while one for a video
+is queued or running, or finished less than JOB_TTL seconds ago, submitting
+the same video (in any URL form) returns that job instead of starting
+another. Failed jobs and partial ones (cut short by the deadline) aren't
+reused, so a resubmit retries. Transcripts and recipes also go through the
+usual disk caches underneath. Each job runs under its own deadline.budget().
+"""
+import os
+import queue
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+from chef_core import deadline, metrics
+from chef_core.models import resolve_model
+from chef_core.pipeline import extract_recipe, partial_recipe
+from chef_core.transcripts import fetch_transcript, is_valid_transcript
+from chef_core.urls import canonical_video_key
+
+MAX_WORKERS = int(os.environ.get("CHEF_API_WORKERS", 4))
+MAX_PENDING = int(os.environ.get("CHEF_API_MAX_PENDING", 64))
+JOB_TTL = float(os.environ.get("CHEF_API_JOB_TTL", 3600))
+
+
+def extract_from_url(url, model_name=None):
+    """URL -> recipe dict, the stealth.py pipeline without Streamlit.
+
+    clients.configure() must already have been called. Raises RuntimeError
+    with the fetcher's message when there is no usable transcript. If Gemini
+    runs out of time, the result is pipeline.partial_recipe() with
+    "partial": true.
+    """
+    transcript_text = fetch_transcript(url)
+    if not is_valid_transcript(transcript_text):
+        raise RuntimeError(transcript_text or "Error: No captions found.")
+    model_name = resolve_model(model_name)
+    try:
+        recipe = extract_recipe(transcript_text, model_name)
+    except deadline.DeadlineExpired:
+        recipe = {"partial": True, **partial_recipe(transcript_text)}
+    # The model that answered, if generate() had to replace ours
+    return {"url": url, "model": resolve_model(model_name), **recipe}
+
+
+class Job:
+    def __init__(self, url, key):
+        self.id = uuid.uuid4().hex
+        self.url = url
+        self.key = key
+        self.status = "queued"      # -> running -> done | error
+        self.result = None
+        self.error = None
+        self.created = time.time()
+        self.finished = None
+        self._done = threading.Event()
+
+    def wait(self, timeout=None):
+        """Block until the job has finished or `timeout` passed; True if finished."""
+        return self._done.wait(timeout)
+
+    def to_dict(self):
+        job = {"id": self.id, "url": self.url, "status": self.status}
+        if self.result is not None:
+            job["recipe"] = self.result
+        if self.error is not None:
+            job["error"] = self.error
+        return job
+
+
+class JobQueue:
+    """Bounded worker pool plus an id -> Job map, deduplicated per video.
+
+    submit() raises queue.Full once MAX_PENDING jobs are queued or running.
+    """
+
+    def __init__(self, run=extract_from_url, max_workers=MAX_WORKERS, max_pending=MAX_PENDING, ttl=JOB_TTL):
+        self._run = run
+        self.max_pending = max_pending
+        self.ttl = ttl
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="chef-job")
+        self._lock = threading.Lock()
+        self._jobs = {}         # job id -> Job
+        self._by_key = {}       # video key -> latest Job that hasn't failed or come back partial
+        self._pending = 0
+
+    def _expire(self, now):
+        for job_id, job in list(self._jobs.items()):
+            if job.finished is not None and now - job.finished > self.ttl:
+                del self._jobs[job_id]
+                if self._by_key.get(job.key) is job:
+                    del self._by_key[job.key]
+
+    def submit(self, url):
+        key = canonical_video_key(url)
+        with self._lock:
+            self._expire(time.time())
+            job = self._by_key.get(key)
+            if job is not None:
+                metrics.incr("api_jobs", result="deduplicated")
+                return job
+            if self._pending >= self.max_pending:
+                metrics.incr("api_jobs", result="rejected")
+                raise queue.Full(f"{self._pending} jobs already pending")
+            job = Job(url, key)
+            self._jobs[job.id] = job
+            self._by_key[key] = job
+            self._pending += 1
+        metrics.incr("api_jobs", result="queued")
+        self._executor.submit(self._work, job)
+        return job
+
+    def _work(self, job):
+        job.status = "running"
+        try:
+            with metrics.trace("api_job"), deadline.budget(), metrics.span("api/job"):
+                job.result = self._run(job.url)
+            job.status = "done"
+        except Exception as e:
+            job.error = str(e)
+            job.status = "error"
+            metrics.incr("failures", stage="api/job", reason=type(e).__name__)
+        finally:
+            job.finished = time.time()
+            retry = job.status == "error" or (job.result or {}).get("partial")
+            with self._lock:
+                self._pending -= 1
+                if retry and self._by_key.get(job.key) is job:
+                    del self._by_key[job.key]
+            job._done.set()
+
+    def get(self, job_id):
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def stats(self):
+        with self._lock:
+            return {"jobs": len(self._jobs), "pending": self._pending, "max_pending": self.max_pending}
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
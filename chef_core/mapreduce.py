@@ -0,0 +1,154 @@
+"""Chunked extraction for transcripts too long for one prompt.
+
+The full transcript is split into overlapping word chunks. Each chunk goes
+through the usual three-section prompt in parallel, and the partial recipes
+are merged locally.
+"""
+import re
+from concurrent.futures import ThreadPoolExecutor
+
+from chef_core import deadline, metrics
+from chef_core.cache import get_cached_recipe, recipe_cache_key, store_recipe
+from chef_core.condense import NUMBER_WORDS, UNITS
+from chef_core.models import resolve_model
+from chef_core.pipeline import generate
+from chef_core.recipe import PROMPT_VERSION, has_sections, parse_recipe_response
+
+CHUNK_WORDS = 2500
+OVERLAP_WORDS = 150     # so a step cut at a chunk edge is seen whole at least once
+MAX_PARALLEL_CHUNKS = 4
+CHUNKED_PROMPT_VERSION = f"{PROMPT_VERSION}-chunked-1"
+
+CHUNK_PROMPT = """
+                    You are a professional chef. This is part {part} of {parts} of a long cooking video transcript.
+                    Extract ONLY what is said in this part. Do not invent steps from other parts.
+
+                    RULES FOR INGREDIENTS:
+                    1. If the transcript mentions a quantity, USE IT exactly.
+                    2. Only if it is silent on quantity, estimate it and prefix with "(Est.)".
+                    3. FORMAT: "Quantity + Ingredient Name" (e.g., "12 oz Pasta").
+                    4. Never list "to taste" or "garnish" as a separate line.
+
+                    OUTPUT FORMAT:
+
+                    SECTION 1: METADATA
+                    Format: "Difficulty | Time" for the whole dish, or "Unknown | Unknown" if this part doesn't say.
+
+                    SECTION 2: INSTRUCTIONS
+                    A numbered list of the steps in this part. Write "None" if there are none. Do NOT use the word "Section".
+
+                    SECTION 3: INGREDIENTS
+                    Format: Quantity + Item, separated by the pipe symbol (|). Write "None" if there are none.
+
+                    SEPARATOR:
+                    Use "###SPLIT###" strictly between the three sections.
+
+                    Transcript: {transcript}
+                    """
+
+_STEP_NUMBER = re.compile(r"^\s*(?:\d+[.)]|[-*•])\s*")
+_QUANTITY = re.compile(r"^[\d½⅓⅔¼¾⅛/.,-]+$")
+
+
+def split_chunks(text, chunk_words=CHUNK_WORDS, overlap_words=OVERLAP_WORDS):
+    words = text.split()
+    if len(words) <= chunk_words:
+        return [text]
+    step = chunk_words - overlap_words
+    return [" ".join(words[i:i + chunk_words]) for i in range(0, len(words) - overlap_words, step)]
+
+
+def _words(text):
+    return set(re.findall(r"[a-z0-9]+", text.lower()))
+
+
+def _ingredient_name(item):
+    """'2 cups of Flour' -> 'flour', used to spot the same ingredient twice."""
+    tokens = item.replace("(Est.)", "").lower().split()
+    while tokens and (_QUANTITY.match(tokens[0]) or tokens[0] in UNITS
+                      or tokens[0] in NUMBER_WORDS or tokens[0] in ("of", "a", "an")):
+        tokens.pop(0)
+    return " ".join(tokens)
+
+
+def merge_recipes(partials):
+    """Combine per-chunk recipes, in chunk order, into one recipe dict."""
+    meta = "Unknown | Unknown"
+    for part in partials:
+        if "unknown" not in part["meta"].lower() and "|" in part["meta"]:
+            meta = part["meta"]
+            break
+
+    steps = []
+    seen_steps = []
+    for part in partials:
+        for line in part["instructions"].splitlines():
+            step = _STEP_NUMBER.sub("", line).strip()
+            if not step or step.lower().rstrip(".") == "none":
+                continue
+            words = _words(step)
+            # The chunk overlap means the same step can come back from two chunks
+            if any(len(words & other) >= 0.8 * max(len(words | other), 1) for other in seen_steps):
+                continue
+            seen_steps.append(words)
+            steps.append(step)
+
+    ingredients = {}
+    for part in partials:
+        for item in part["ingredients"]:
+            if item.lower().rstrip(".") == "none":
+                continue
+            name = _ingredient_name(item) or item.lower()
+            current = ingredients.get(name)
+            # A quantity heard in the video beats an estimate from another chunk
+            if current is None or ("(Est.)" in current and "(Est.)" not in item):
+                ingredients[name] = item
+
+    return {
+        "meta": meta,
+        "instructions": "\n".join(f"{i}. {step}" for i, step in enumerate(steps, 1)),
+        "ingredients": list(ingredients.values()),
+    }
+
+
+def extract_recipe_chunked(transcript_text, model_name=None, max_parallel=MAX_PARALLEL_CHUNKS):
+    """Like pipeline.extract_recipe() but covers the whole transcript."""
+    model_name = resolve_model(model_name)
+    cache_key = recipe_cache_key(transcript_text, CHUNKED_PROMPT_VERSION, model_name)
+    recipe = get_cached_recipe(cache_key)
+    if recipe is not None:
+        return recipe
+
+    chunks = split_chunks(transcript_text)
+
+    def run(indexed):
+        part, chunk = indexed
+        prompt = CHUNK_PROMPT.format(part=part, parts=len(chunks), transcript=chunk)
+        text = generate(model_name, prompt).text
+        return has_sections(text, 3), parse_recipe_response(text)
+
+    # One llm budget per round of parallel calls, never past the deadline
+    rounds = -(-len(chunks) // max_parallel)
+    deadline.check("llm")
+    timeout = deadline.STAGE_BUDGETS["llm"] * rounds
+    left = deadline.remaining()
+    if left is not None:
+        timeout = min(timeout, left)
+
+    pool = ThreadPoolExecutor(max_workers=max_parallel)
+    try:
+        with deadline.guard("llm"):
+            answers = list(pool.map(metrics.in_context(run), enumerate(chunks, 1), timeout=timeout))
+    finally:
+        # After a timeout, chunks still queued are dropped rather than waited for
+        pool.shutdown(wait=False, cancel_futures=True)
+
+    recipe = merge_recipes([partial for _, partial in answers])
+    if not all(complete for complete, _ in answers):
+        # Merged and shown as is, but never cached, as in extract_recipe()
+        metrics.incr("failures", stage="llm/parse", reason="missing_sections")
+        return recipe
+    # Under the model that answered, if generate() had to replace ours
+    cache_key = recipe_cache_key(transcript_text, CHUNKED_PROMPT_VERSION, resolve_model(model_name))
+    store_recipe(cache_key, recipe)
+    return recipe
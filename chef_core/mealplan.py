@@ -0,0 +1,259 @@
+"""Several videos at once: batched extraction and one merged shopping list.
+
+Transcripts are condensed to PER_RECIPE_TOKENS each and packed, in order,
+into as few prompts as BATCH_MAX_TOKENS allows; Gemini answers each batch
+with the usual three sections per recipe, recipes separated by ###RECIPE###.
+A batch whose answer doesn't split into the right number of recipes is
+redone one recipe at a time with pipeline.extract_recipe().
+
+The per-recipe ingredient lists are then merged: quantities of the same
+ingredient are converted to a common unit (tsp/tbsp/cup, oz/lb, metric when
+the recipes use metric) and summed.
+"""
+import os
+import re
+from concurrent.futures import ThreadPoolExecutor
+
+from chef_core import metrics
+from chef_core.cache import get_cached_recipe, recipe_cache_key, store_recipe
+from chef_core.condense import CHARS_PER_TOKEN, condense_transcript
+from chef_core.ingredients import MODIFIERS, local_ingredients, parse_item, singular
+from chef_core.models import resolve_model
+from chef_core.pipeline import extract_recipe, generate
+from chef_core.recipe import PROMPT_VERSION, parse_recipe_response
+
+PER_RECIPE_TOKENS = int(os.environ.get("CHEF_PLAN_RECIPE_TOKENS", 1500))
+BATCH_MAX_TOKENS = int(os.environ.get("CHEF_PLAN_BATCH_TOKENS", 6000))
+MAX_BATCH_RECIPES = 5
+MAX_PARALLEL_BATCHES = 4
+BATCH_PROMPT_VERSION = f"{PROMPT_VERSION}-batch-1"
+RECIPE_SPLIT = "###RECIPE###"
+
+BATCH_PROMPT = """
+                    You are a professional chef. Below are {count} cooking video transcripts, each starting with "=== RECIPE n ===".
+                    Extract every recipe, in the same order. Never mix up details between recipes.
+
+                    CRITICAL INSTRUCTION FOR INGREDIENTS:
+                    1. ACCURACY FIRST: If the transcript explicitly mentions a quantity (e.g., "2 cups", "10 oz", "a handful"), USE IT exactly.
+                    2. GAPS ONLY: Only if the transcript is completely silent on quantity, estimate it and prefix it with "(Est.)".
+                    3. FORMAT: Always use "Quantity + Ingredient Name" (e.g., "12 oz Pasta").
+                    4. CLEANUP: Never list "to taste" or "garnish" as a separate line.
+
+                    OUTPUT FORMAT FOR EACH RECIPE:
+
+                    SECTION 1: METADATA
+                    Format: "Difficulty | Time"
+                    Example: Easy | 15 Mins
+
+                    SECTION 2: INSTRUCTIONS
+                    Write a clean, numbered list of steps. Do NOT use the word "Section".
+
+                    SECTION 3: INGREDIENTS
+                    Format: Quantity + Item.
+                    Must be separated by the pipe symbol (|).
+
+                    SEPARATORS:
+                    Use "###SPLIT###" strictly between the three sections of a recipe.
+                    Use "###RECIPE###" strictly between recipes.
+
+                    {transcripts}
+                    """
+
+_RECIPE_HEADER = re.compile(r"^\s*=+\s*recipe\s*\d+\s*=+\s*", re.I)
+
+# unit -> (family, size in the family's base unit: ml or g)
+UNIT_SIZES = {
+    "tsp": ("volume", 4.92892), "tbsp": ("volume", 14.7868), "cup": ("volume", 236.588),
+    "pint": ("volume", 473.176), "quart": ("volume", 946.353),
+    "ml": ("volume", 1.0), "liter": ("volume", 1000.0),
+    "oz": ("weight", 28.3495), "lb": ("weight", 453.592),
+    "g": ("weight", 1.0), "kg": ("weight", 1000.0),
+}
+METRIC = frozenset({"ml", "liter", "g", "kg"})
+# Units to display a summed amount in, largest first, with the smallest
+# amount worth showing in that unit
+DISPLAY_UNITS = {
+    ("volume", False): (("cup", 0.5), ("tbsp", 1.0), ("tsp", 0.0)),
+    ("volume", True): (("liter", 1.0), ("ml", 0.0)),
+    ("weight", False): (("lb", 1.0), ("oz", 0.0)),
+    ("weight", True): (("kg", 1.0), ("g", 0.0)),
+}
+_FRACTIONS = ((0, ""), (1 / 8, "1/8"), (1 / 4, "1/4"), (1 / 3, "1/3"), (3 / 8, "3/8"), (1 / 2, "1/2"),
+              (5 / 8, "5/8"), (2 / 3, "2/3"), (3 / 4, "3/4"), (7 / 8, "7/8"), (1, ""))
+_MODIFIERS = frozenset(MODIFIERS)
+
+
+def estimate_tokens(text):
+    return len(text) // CHARS_PER_TOKEN + 1
+
+
+def pack_batches(transcripts, max_tokens=BATCH_MAX_TOKENS, max_recipes=MAX_BATCH_RECIPES):
+    """Group (index, condensed transcript) pairs into prompt-sized batches, in order."""
+    batches, current, used = [], [], 0
+    for index, text in enumerate(transcripts):
+        condensed = condense_transcript(text, PER_RECIPE_TOKENS)
+        cost = estimate_tokens(condensed)
+        if current and (used + cost > max_tokens or len(current) >= max_recipes):
+            batches.append(current)
+            current, used = [], 0
+        current.append((index, condensed))
+        used += cost
+    if current:
+        batches.append(current)
+    return batches
+
+
+def build_batch_prompt(batch):
+    sections = "\n\n".join(f"=== RECIPE {n} ===\n{text}" for n, (_, text) in enumerate(batch, 1))
+    return BATCH_PROMPT.format(count=len(batch), transcripts=sections)
+
+
+def parse_batch_response(text, count):
+    """List of `count` recipe dicts, or None if the answer doesn't split cleanly."""
+    parts = [part for part in text.split(RECIPE_SPLIT) if part.strip()]
+    if len(parts) != count:
+        return None
+    recipes = [parse_recipe_response(_RECIPE_HEADER.sub("", part.strip())) for part in parts]
+    if any(recipe["meta"] == "Unknown | Unknown" and not recipe["ingredients"] for recipe in recipes):
+        return None
+    return recipes
+
+
+def extract_meal_plan(transcripts, model_name=None, max_parallel=MAX_PARALLEL_BATCHES):
+    """One recipe dict per transcript, same order, from as few Gemini calls as fit.
+
+    clients.configure() must already have been called. Recipes already in
+    the cache (from the single-video flow or an earlier plan) aren't re-sent.
+    """
+    model_name = resolve_model(model_name)
+    recipes = [None] * len(transcripts)
+    todo = []
+    for index, text in enumerate(transcripts):
+        recipe = (get_cached_recipe(recipe_cache_key(text, PROMPT_VERSION, model_name))
+                  or get_cached_recipe(recipe_cache_key(text, BATCH_PROMPT_VERSION, model_name)))
+        if recipe is not None:
+            recipes[index] = recipe
+        else:
+            todo.append(index)
+
+    def run(batch):
+        if len(batch) == 1:
+            index = batch[0][0]
+            return [(index, extract_recipe(transcripts[index], model_name))]
+        with metrics.span("mealplan/batch"):
+            response = generate(model_name, build_batch_prompt(batch))
+        parsed = parse_batch_response(response.text, len(batch))
+        if parsed is None:
+            metrics.incr("fallbacks", kind="mealplan_unbatched")
+            return [(index, extract_recipe(transcripts[index], model_name)) for index, _ in batch]
+        results = []
+        for (index, _), recipe in zip(batch, parsed):
+            local = local_ingredients(transcripts[index])
+            if local is not None:
+                recipe["ingredients"] = local
+            # Under the model that answered, if generate() had to replace ours
+            cache_key = recipe_cache_key(transcripts[index], BATCH_PROMPT_VERSION, resolve_model(model_name))
+            store_recipe(cache_key, recipe)
+            results.append((index, recipe))
+        return results
+
+    batches = pack_batches([transcripts[i] for i in todo])
+    # pack_batches numbers its input from 0, map back to positions in `transcripts`
+    batches = [[(todo[i], text) for i, text in batch] for batch in batches]
+    with ThreadPoolExecutor(max_workers=max_parallel) as pool:
+        for results in pool.map(metrics.in_context(run), batches):
+            for index, recipe in results:
+                recipes[index] = recipe
+    return recipes
+
+
+def ingredient_key(name):
+    """'Large Eggs' and 'egg' are the same thing on a shopping list."""
+    words = [w for w in re.findall(r"[a-z]+", name.lower()) if w not in _MODIFIERS]
+    if words:
+        words[-1] = singular(words[-1])
+    return " ".join(words)
+
+
+def format_amount(value):
+    """1.5 -> '1 1/2', 0.33 -> '1/3', 250.0 -> '250'."""
+    if value >= 10:
+        return f"{round(value):g}"
+    whole = int(value)
+    frac, label = min(_FRACTIONS, key=lambda f: abs(value - whole - f[0]))
+    if frac == 1:
+        whole, label = whole + 1, ""
+    if not label:
+        # Never round something on the list down to nothing
+        return str(whole) if whole else "1/8"
+    return f"{whole} {label}" if whole else label
+
+
+def _display(total, family, metric):
+    for unit, minimum in DISPLAY_UNITS[(family, metric)]:
+        amount = total / UNIT_SIZES[unit][1]
+        if amount >= minimum - 1e-3:
+            return amount, unit
+    return total, DISPLAY_UNITS[(family, metric)][-1][0]
+
+
+def _plural(unit, amount):
+    if unit in UNIT_SIZES and unit not in ("cup", "pint", "quart", "liter"):
+        return unit
+    if amount <= 1:
+        return unit
+    return unit + ("es" if unit.endswith(("ch", "sh")) else "s")
+
+
+def merge_shopping_lists(lists):
+    """One shopping list from several recipes' ingredient lists.
+
+    Amounts of the same ingredient are summed when their units convert
+    (volume to volume, weight to weight, or the same unit such as cloves);
+    anything that doesn't add up stays on its own line.
+    """
+    merged = {}     # (ingredient key, family) -> entry
+    order = []
+    for items in lists:
+        for item in items:
+            parsed = parse_item(item)
+            key = ingredient_key(parsed["name"])
+            if parsed["value"] is None:
+                family = ("text", item.lower())
+            elif parsed["unit"] in UNIT_SIZES:
+                family = UNIT_SIZES[parsed["unit"]][0]
+            else:
+                family = parsed["unit"] or "count"
+            entry = merged.get((key, family))
+            if entry is None:
+                entry = merged[(key, family)] = {
+                    "name": parsed["name"], "family": family, "total": 0.0,
+                    "metric": False, "estimated": False, "text": item, "units": set(),
+                }
+                order.append((key, family))
+            if parsed["value"] is not None:
+                size = UNIT_SIZES[parsed["unit"]][1] if parsed["unit"] in UNIT_SIZES else 1.0
+                entry["total"] += parsed["value"] * size
+                entry["metric"] = entry["metric"] or parsed["unit"] in METRIC
+                entry["units"].add(parsed["unit"])
+                entry["estimated"] = entry["estimated"] or parsed["estimated"]
+
+    shopping = []
+    for key in order:
+        entry = merged[key]
+        family = entry["family"]
+        if isinstance(family, tuple):
+            shopping.append(entry["text"])
+            continue
+        if family in ("volume", "weight") and len(entry["units"]) == 1:
+            # Nothing to convert, keep the recipe's own unit
+            unit = next(iter(entry["units"]))
+            amount = entry["total"] / UNIT_SIZES[unit][1]
+        elif family in ("volume", "weight"):
+            amount, unit = _display(entry["total"], family, entry["metric"])
+        else:
+            amount, unit = entry["total"], (None if family == "count" else family)
+        words = [format_amount(amount)] + ([_plural(unit, amount)] if unit else []) + [entry["name"]]
+        line = " ".join(words)
+        shopping.append(f"(Est.) {line}" if entry["estimated"] else line)
+    return shopping
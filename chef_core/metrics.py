@@ -0,0 +1,226 @@
+"""Stage timings and event counters, per process and per request.
+
+span("ytdlp/extract_info") times a block (or a function, as a decorator)
+into a process-wide latency histogram. If a request trace is active, started
+with trace(), the span is also appended to it, which is what the debug
+waterfall in stealth.py draws. incr() bumps a labelled counter such as
+cache_lookups{cache="recipes", result="hit"}.
+
+The active trace lives in a contextvar, so work handed to a thread pool only
+shows up in it when submitted through in_context(). Everything can be
+exported as Prometheus text or JSON lines; set CHEF_TRACE_LOG to a path to
+also append every finished trace there as one JSON line.
+"""
+import contextlib
+import contextvars
+import json
+import os
+import threading
+import time
+
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+TRACE_LOG = os.environ.get("CHEF_TRACE_LOG")
+
+_current = contextvars.ContextVar("chef_trace", default=None)
+_lock = threading.Lock()
+_stages = {}
+_counters = {}
+
+
+class Trace:
+    """Spans and counters recorded while handling one request."""
+
+    def __init__(self, name):
+        self.name = name
+        self.wall = time.time()
+        self.started = time.perf_counter()
+        self.elapsed = None
+        self.spans = []
+        self.counters = {}
+
+    def add(self, name, start, duration, ok):
+        self.spans.append({
+            "stage": name,
+            "start_ms": round((start - self.started) * 1000, 2),
+            "ms": round(duration * 1000, 2),
+            "ok": ok,
+        })
+
+    def to_dict(self):
+        return {
+            "trace": self.name,
+            "time": self.wall,
+            "ms": round(self.elapsed * 1000, 2) if self.elapsed is not None else None,
+            "spans": sorted(self.spans, key=lambda s: s["start_ms"]),
+            "counters": dict(self.counters),
+        }
+
+
+def current_trace():
+    return _current.get()
+
+
+@contextlib.contextmanager
+def trace(name="request"):
+    """Collect every span and counter in this context into a new Trace."""
+    request = Trace(name)
+    token = _current.set(request)
+    try:
+        yield request
+    finally:
+        _current.reset(token)
+        request.elapsed = time.perf_counter() - request.started
+        if TRACE_LOG:
+            with _lock, open(TRACE_LOG, "a", encoding="utf-8") as f:
+                f.write(json.dumps(request.to_dict()) + "\n")
+
+
+def observe(name, seconds, ok=True, start=None):
+    """Record a finished stage that wasn't timed with span()."""
+    with _lock:
+        stage = _stages.get(name)
+        if stage is None:
+            stage = _stages[name] = {"count": 0, "failures": 0, "sum": 0.0, "buckets": [0] * len(BUCKETS)}
+        stage["count"] += 1
+        stage["sum"] += seconds
+        if not ok:
+            stage["failures"] += 1
+        for i, bound in enumerate(BUCKETS):
+            if seconds <= bound:
+                stage["buckets"][i] += 1
+                break
+    request = _current.get()
+    if request is not None:
+        request.add(name, start if start is not None else time.perf_counter() - seconds, seconds, ok)
+
+
+@contextlib.contextmanager
+def span(name):
+    """Time the block as stage `name`; an exception marks it failed."""
+    start = time.perf_counter()
+    ok = False
+    try:
+        yield
+        ok = True
+    finally:
+        observe(name, time.perf_counter() - start, ok, start)
+
+
+def timed(name, iterable):
+    """Yield from `iterable`, recording only the time spent waiting on it.
+
+    For streamed responses, where wrapping the loop in span() would also
+    count whatever the consumer does between chunks.
+    """
+    iterator = iter(iterable)
+    first = None
+    waited = 0.0
+    ok = False
+    try:
+        while True:
+            t = time.perf_counter()
+            if first is None:
+                first = t
+            try:
+                item = next(iterator)
+            except StopIteration:
+                waited += time.perf_counter() - t
+                ok = True
+                return
+            waited += time.perf_counter() - t
+            yield item
+    finally:
+        observe(name, waited, ok, first)
+
+
+def incr(name, value=1, **labels):
+    key = (name, tuple(sorted(labels.items())))
+    with _lock:
+        _counters[key] = _counters.get(key, 0) + value
+    request = _current.get()
+    if request is not None:
+        label = name + "".join(f" {k}={v}" for k, v in key[1])
+        request.counters[label] = request.counters.get(label, 0) + value
+
+
+def in_context(fn):
+    """Wrap `fn` so it runs in a copy of the caller's context when a pool
+    thread calls it, keeping its spans in the caller's trace."""
+    context = contextvars.copy_context()
+
+    def run(*args, **kwargs):
+        # A Context can only be entered by one thread at a time
+        return context.copy().run(fn, *args, **kwargs)
+
+    return run
+
+
+def snapshot():
+    with _lock:
+        return (
+            {name: dict(stage, buckets=list(stage["buckets"])) for name, stage in _stages.items()},
+            dict(_counters),
+        )
+
+
+def reset():
+    with _lock:
+        _stages.clear()
+        _counters.clear()
+
+
+def _labels(pairs):
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{k}="{v}"' for k, v in pairs) + "}"
+
+
+def prometheus_text(prefix="chef"):
+    stages, counters = snapshot()
+    lines = [f"# TYPE {prefix}_stage_seconds histogram"]
+    for name, stage in sorted(stages.items()):
+        cumulative = 0
+        for bound, count in zip(BUCKETS, stage["buckets"]):
+            cumulative += count
+            lines.append(f'{prefix}_stage_seconds_bucket{{stage="{name}",le="{bound}"}} {cumulative}')
+        lines.append(f'{prefix}_stage_seconds_bucket{{stage="{name}",le="+Inf"}} {stage["count"]}')
+        lines.append(f'{prefix}_stage_seconds_sum{{stage="{name}"}} {stage["sum"]:.6f}')
+        lines.append(f'{prefix}_stage_seconds_count{{stage="{name}"}} {stage["count"]}')
+    lines.append(f"# TYPE {prefix}_stage_failures_total counter")
+    for name, stage in sorted(stages.items()):
+        lines.append(f'{prefix}_stage_failures_total{{stage="{name}"}} {stage["failures"]}')
+    for counter in sorted({name for name, _ in counters}):
+        lines.append(f"# TYPE {prefix}_{counter}_total counter")
+        for (name, labels), value in sorted(counters.items()):
+            if name == counter:
+                lines.append(f"{prefix}_{name}_total{_labels(labels)} {value}")
+    return "\n".join(lines) + "\n"
+
+
+def json_lines():
+    """One JSON object per stage and per counter."""
+    stages, counters = snapshot()
+    records = [
+        {"type": "stage", "stage": name, "count": s["count"], "failures": s["failures"],
+         "sum_s": round(s["sum"], 6), "buckets": dict(zip(map(str, BUCKETS), s["buckets"]))}
+        for name, s in sorted(stages.items())
+    ]
+    records += [
+        {"type": "counter", "name": name, "labels": dict(labels), "value": value}
+        for (name, labels), value in sorted(counters.items())
+    ]
+    return "".join(json.dumps(r) + "\n" for r in records)
+
+
+def format_waterfall(request, width=32):
+    """Plain-text waterfall of a Trace, one row per span in start order."""
+    data = request.to_dict()
+    total = max([data["ms"] or 0] + [s["start_ms"] + s["ms"] for s in data["spans"]]) or 1
+    rows = [f"{'stage':<26}{'start':>9}{'ms':>9}  {data['trace']} ({total:.0f} ms)"]
+    for s in data["spans"]:
+        offset = min(width - 1, int(s["start_ms"] / total * width))
+        length = max(1, round(s["ms"] / total * width))
+        bar = "·" * offset + "█" * min(length, width - offset)
+        mark = "" if s["ok"] else "  ✗"
+        rows.append(f"{s['stage']:<26}{s['start_ms']:>9.1f}{s['ms']:>9.1f}  {bar:<{width}}{mark}")
+    return "\n".join(rows)
@@ -0,0 +1,135 @@
+import os
+import threading
+import time
+
+from chef_core import clients, deadline, metrics
+
+# Checked in order before we ever touch genai.list_models()
+PREFERRED_MODELS = [
+    name.strip()
+    for name in os.environ.get(
+        "CHEF_PREFERRED_MODELS", "models/gemini-1.5-flash,models/gemini-1.5-pro"
+    ).split(",")
+    if name.strip()
+]
+MODEL_TTL = float(os.environ.get("CHEF_MODEL_TTL", 6 * 3600))
+FALLBACK_MODEL = 'models/gemini-pro'
+
+_lock = threading.Lock()
+_resolved = None        # model name currently handed out
+_resolved_at = 0.0
+_failed = set()         # names that errored since the last catalogue fetch
+_replacements = {}      # retired name -> the model that answered instead
+_refreshing = False
+
+
+def _discover(exclude=()):
+    """Walk the catalogue once: first usable preferred model, else any gemini."""
+    with metrics.span("model/list_models"), deadline.guard("model"):
+        available = [
+            m.name for m in clients.genai().list_models(request_options={"timeout": deadline.timeout("model")})
+            if 'generateContent' in m.supported_generation_methods
+        ]
+    for name in PREFERRED_MODELS:
+        if name in available and name not in exclude:
+            return name
+    for name in available:
+        if 'gemini' in name and name not in exclude:
+            return name
+    metrics.incr("fallbacks", kind="model_catalogue")
+    return FALLBACK_MODEL
+
+
+def _set_resolved(name):
+    global _resolved, _resolved_at
+    _resolved = name
+    _resolved_at = time.monotonic()
+
+
+def _background_refresh():
+    global _refreshing
+    try:
+        # The catalogue is the source of truth here, so past failures get a second chance
+        name = _discover()
+        with _lock:
+            _failed.clear()
+            _set_resolved(name)
+    except Exception:
+        pass  # Keep serving the stale name, we'll try again next TTL
+    finally:
+        with _lock:
+            _refreshing = False
+
+
+@metrics.span("model/resolve")
+def get_valid_model():
+    """Model name to use for generate_content, memoized per process.
+
+    A fresh cached name costs nothing. A stale one is still returned while a
+    background thread re-checks the catalogue. With nothing cached we hand out
+    the first preferred model that hasn't failed, so list_models() only runs in
+    the foreground once every preferred model has been reported broken.
+    """
+    global _refreshing
+    with _lock:
+        if _resolved and _resolved not in _failed:
+            if time.monotonic() - _resolved_at > MODEL_TTL and not _refreshing:
+                _refreshing = True
+                threading.Thread(target=_background_refresh, daemon=True).start()
+            return _resolved
+        for name in PREFERRED_MODELS:
+            if name not in _failed:
+                _set_resolved(name)
+                return name
+    return _resolve_from_catalogue()
+
+
+def _resolve_from_catalogue():
+    with _lock:
+        exclude = set(_failed)
+    try:
+        name = _discover(exclude=exclude)
+    except Exception:
+        metrics.incr("fallbacks", kind="model_catalogue")
+        return FALLBACK_MODEL
+    with _lock:
+        _set_resolved(name)
+    return name
+
+
+def report_model_failure(name):
+    """Mark `name` as broken so the next get_valid_model() moves on."""
+    global _resolved
+    with _lock:
+        _failed.add(name)
+        if _resolved == name:
+            _resolved = None
+
+
+@metrics.span("model/replace")
+def replacement_model(name):
+    """A live model to retry with after `name` came back NotFound.
+
+    Unlike get_valid_model() this always asks the catalogue, since the next
+    preferred name may well have been retired along with `name`. The answer
+    is remembered, so resolve_model(name) skips the failing call next time.
+    """
+    report_model_failure(name)
+    replacement = _resolve_from_catalogue()
+    with _lock:
+        _replacements[name] = replacement
+    return replacement
+
+
+def resolve_model(name=None):
+    """The model to call for `name`: itself, or what replaced it once it came
+    back NotFound (a retired model stays retired, so the catalogue refresh
+    leaves these alone). No name means get_valid_model()."""
+    if not name:
+        return get_valid_model()
+    with _lock:
+        seen = set()
+        while name in _replacements and name not in seen:
+            seen.add(name)
+            name = _replacements[name]
+    return name
@@ -0,0 +1,307 @@
+import json
+import threading
+from concurrent.futures import Future
+
+from chef_core import clients, deadline, metrics
+from chef_core.cache import get_cached_recipe, recipe_cache_key, store_recipe
+from chef_core.ingredients import local_ingredients
+from chef_core.models import replacement_model, resolve_model
+from chef_core.recipe import (
+    PROMPT_VERSION,
+    STRUCTURED_FIELDS,
+    STRUCTURED_PROMPT_VERSION,
+    SectionSplitter,
+    build_ingredients_prompt,
+    build_instructions_prompt,
+    build_recipe_prompt,
+    build_structured_prompt,
+    clean_ingredients,
+    has_sections,
+    parse_ingredient_list,
+    parse_instructions_response,
+    parse_recipe_response,
+    parse_structured_response,
+    structured_config,
+)
+from chef_core.scheduler import get_scheduler, key_digest, request_key
+from chef_core.similarity import remember_transcript, similar_recipe
+
+_streams_lock = threading.Lock()
+_streams = {}       # (recipe cache key, key digest) -> Future of the recipe being streamed
+
+
+def generate(model_name, prompt, stream=False, generation_config=None):
+    """generate_content() through the scheduler: rate limited, retried and,
+    unless streaming, shared with identical requests already in flight
+    made with the same API key."""
+    scheduler = get_scheduler()
+    # Read here, in the caller's context: the scheduler charges this key and
+    # never hands its outcome (a quota error, say) to callers with another
+    api_key = clients.configured_key()
+
+    def call(name):
+        # With stream=True this returns once the first chunk is in
+        with metrics.span("llm/generate"):
+            return clients.generative_model(name).generate_content(
+                prompt, stream=stream, generation_config=generation_config,
+                request_options={"timeout": deadline.timeout("llm")},
+            )
+
+    def submit(name):
+        key = None
+        if not stream:
+            key = request_key(name, prompt, json.dumps(generation_config, sort_keys=True), key_digest(api_key))
+        with deadline.guard("llm"):
+            return scheduler.submit(lambda: call(name), key=key, api_key=api_key)
+
+    model_name = resolve_model(model_name)
+    try:
+        return submit(model_name)
+    except clients.not_found_error():
+        # Cached model got retired, retry once with one the catalogue lists
+        metrics.incr("fallbacks", kind="model_not_found")
+        return submit(replacement_model(model_name))
+
+
+def cached_recipe(transcript_text, prompt_version, model_name):
+    """(cache key, recipe or None): the exact cache first, then a recipe
+    from a near-duplicate transcript, which is copied under our own key."""
+    cache_key = recipe_cache_key(transcript_text, prompt_version, model_name)
+    recipe = get_cached_recipe(cache_key)
+    if recipe is None:
+        recipe = similar_recipe(transcript_text, prompt_version, model_name)
+        if recipe is not None:
+            store_recipe(cache_key, recipe)
+    return cache_key, recipe
+
+
+def remember_recipe(transcript_text, prompt_version, model_name, cache_key, recipe):
+    """Cache a fresh, complete recipe and index its transcript for
+    near-duplicates. Callers skip this for answers that failed to parse."""
+    answered = resolve_model(model_name)
+    if answered != model_name:
+        # generate() retried with a replacement, file the answer under it
+        model_name = answered
+        cache_key = recipe_cache_key(transcript_text, prompt_version, model_name)
+    store_recipe(cache_key, recipe)
+    remember_transcript(transcript_text, prompt_version, model_name, cache_key)
+
+
+def extract_recipe(transcript_text, model_name=None):
+    """Run the stealth.py prompt over a transcript and return the parsed recipe.
+
+    clients.configure() must already have been called. Results are served from
+    the recipe cache when the same transcript/prompt/model was seen before, or
+    a near-duplicate of it (chef_core.similarity).
+    When the transcript spells out its quantities, the ingredients come from
+    the local extractor and Gemini only writes the instructions. An answer
+    missing its ###SPLIT### sections is returned but not cached.
+    """
+    model_name = resolve_model(model_name)
+    cache_key, recipe = cached_recipe(transcript_text, PROMPT_VERSION, model_name)
+    if recipe is None:
+        ingredients = local_ingredients(transcript_text)
+        if ingredients is not None:
+            response = generate(model_name, build_instructions_prompt(transcript_text))
+            recipe = dict(parse_instructions_response(response.text), ingredients=ingredients)
+            complete = has_sections(response.text, 2)
+        else:
+            response = generate(model_name, build_recipe_prompt(transcript_text))
+            recipe = parse_recipe_response(response.text)
+            complete = has_sections(response.text, 3)
+        if complete:
+            remember_recipe(transcript_text, PROMPT_VERSION, model_name, cache_key, recipe)
+        else:
+            # Shown as is, but a retry should get a fresh answer
+            metrics.incr("failures", stage="llm/parse", reason="missing_sections")
+    return recipe
+
+
+def _structured_call(model_name, transcript_text, keys):
+    response = generate(
+        model_name, build_structured_prompt(transcript_text, keys), generation_config=structured_config(keys)
+    )
+    with metrics.span("llm/parse_structured"):
+        return parse_structured_response(response.text, keys)
+
+
+def extract_recipe_structured(transcript_text, model_name=None):
+    """extract_recipe() with the compact JSON protocol (recipe.STRUCTURED_PROMPT).
+
+    Fewer output tokens and no section splitting. If the answer lacks a part
+    (or isn't valid JSON), only the missing keys are asked for again, once.
+    A recipe still incomplete after that is returned with placeholders and
+    not cached. Models that reject JSON mode get extract_recipe() instead.
+    """
+    model_name = resolve_model(model_name)
+    cache_key, recipe = cached_recipe(transcript_text, STRUCTURED_PROMPT_VERSION, model_name)
+    recipe = recipe or get_cached_recipe(recipe_cache_key(transcript_text, PROMPT_VERSION, model_name))
+    if recipe is not None:
+        return recipe
+
+    local = local_ingredients(transcript_text)
+    keys = [key for key in STRUCTURED_FIELDS if key != "i" or local is None]
+    try:
+        recipe, missing = _structured_call(model_name, transcript_text, keys)
+        if missing:
+            metrics.incr("structured_repairs", keys="".join(missing))
+            repaired, missing = _structured_call(model_name, transcript_text, missing)
+            recipe.update(repaired)
+    except clients.invalid_argument_error():
+        metrics.incr("fallbacks", kind="structured_unsupported")
+        return extract_recipe(transcript_text, model_name)
+
+    if local is not None:
+        recipe["ingredients"] = local
+    recipe = {
+        "meta": recipe.get("meta", "Unknown | Unknown"),
+        "instructions": recipe.get("instructions", ""),
+        "ingredients": recipe.get("ingredients", []),
+    }
+    if missing:
+        metrics.incr("failures", stage="llm/parse_structured", reason="incomplete")
+    else:
+        remember_recipe(transcript_text, STRUCTURED_PROMPT_VERSION, model_name, cache_key, recipe)
+    return recipe
+
+
+def partial_recipe(transcript_text):
+    """What we can show without Gemini once the deadline has run out: the
+    locally extracted ingredients, however unsure, and no instructions."""
+    return {
+        "meta": "Unknown | Unknown",
+        "instructions": "",
+        "ingredients": local_ingredients(transcript_text, min_confidence=0) or [],
+    }
+
+
+def shopping_list(transcript_text, model_name=None):
+    """Ingredient list for the shopping-list-only apps.
+
+    Straight from the local extractor when it is confident, so no Gemini call
+    at all; otherwise INGREDIENTS_PROMPT as before. clients.configure() must
+    already have been called.
+    """
+    items = local_ingredients(transcript_text)
+    if items is not None:
+        return items
+    response = generate(resolve_model(model_name), build_ingredients_prompt(transcript_text))
+    return parse_ingredient_list(response.text)
+
+
+def _yield_recipe(recipe):
+    yield "meta", recipe["meta"]
+    yield "instructions", recipe["instructions"]
+    yield "ingredients", recipe["ingredients"]
+
+
+def stream_recipe(transcript_text, model_name=None):
+    """Streaming flavour of extract_recipe().
+
+    Yields ("meta", str), ("instructions", str) and ("ingredients", list) in
+    that order, each as soon as its section of the response is complete. A
+    cache hit yields all three at once without calling Gemini. Locally
+    extracted ingredients are yielded once the instructions are done. An
+    answer that stops short of the ingredients yields an empty list for them,
+    as parse_recipe_response() does, and isn't cached.
+
+    A stream can only be read once, so generate() can't share it. Instead,
+    while one session streams a transcript, others asking for the same one
+    with the same API key wait for its finished recipe and get all three
+    sections at once, like a cache hit.
+    """
+    model_name = resolve_model(model_name)
+    cache_key, recipe = cached_recipe(transcript_text, PROMPT_VERSION, model_name)
+    if recipe is not None:
+        yield from _yield_recipe(recipe)
+        return
+
+    # Followers share the leader's errors too, so only with the same API key
+    stream_key = (cache_key, key_digest(clients.configured_key()))
+    with _streams_lock:
+        future = _streams.get(stream_key)
+        leader = future is None
+        if leader:
+            future = _streams[stream_key] = Future()
+    if not leader:
+        metrics.incr("llm_coalesced", kind="stream")
+        with metrics.span("llm/stream_wait"), deadline.guard("llm"):
+            deadline.check("llm")
+            recipe = future.result(timeout=deadline.remaining())
+        if recipe is not None:
+            yield from _yield_recipe(recipe)
+            return
+        # The leader's page went away mid-stream, so stream our own
+        yield from _stream_answer(transcript_text, model_name, cache_key)
+        return
+
+    try:
+        recipe = yield from _stream_answer(transcript_text, model_name, cache_key)
+    except Exception as e:
+        future.set_exception(e)
+        raise
+    except BaseException:
+        # Our consumer stopped reading (a rerun): let the followers start over
+        future.set_result(None)
+        raise
+    else:
+        future.set_result(recipe)
+    finally:
+        with _streams_lock:
+            del _streams[stream_key]
+
+
+def _stream_answer(transcript_text, model_name, cache_key):
+    """The streamed Gemini call behind stream_recipe(); returns the recipe."""
+    local = local_ingredients(transcript_text)
+    if local is not None:
+        prompt = build_instructions_prompt(transcript_text)
+    else:
+        prompt = build_recipe_prompt(transcript_text)
+    response = generate(model_name, prompt, stream=True)
+    splitter = SectionSplitter()
+    sections = []
+    recipe = {}
+
+    def finished(section):
+        sections.append(section)
+        if len(sections) == 1:
+            recipe["meta"] = section.strip()
+            return "meta"
+        if len(sections) == 2:
+            recipe["instructions"] = section.strip()
+            return "instructions"
+        if len(sections) == 3 and local is None:
+            recipe["ingredients"] = clean_ingredients(section.strip())
+            return "ingredients"
+        return None
+
+    with deadline.guard("llm"):
+        for chunk in metrics.timed("llm/stream", response):
+            deadline.check("llm")
+            for section in splitter.feed(chunk.text):
+                key = finished(section)
+                if key:
+                    yield key, recipe[key]
+
+    tail = splitter.close()
+    if not sections:
+        # No separator at all, same fallback as parse_recipe_response()
+        recipe = {"meta": "Unknown | Unknown", "instructions": tail}
+        yield "meta", recipe["meta"]
+        yield "instructions", recipe["instructions"]
+    else:
+        key = finished(tail)
+        if key:
+            yield key, recipe[key]
+    if "ingredients" not in recipe:
+        recipe["ingredients"] = local or []
+        yield "ingredients", recipe["ingredients"]
+
+    # Same rule as extract_recipe(): an answer short of its sections is shown
+    # but never cached, so neither mode serves it to the other
+    if len(sections) >= (2 if local is not None else 3):
+        remember_recipe(transcript_text, PROMPT_VERSION, model_name, cache_key, recipe)
+    else:
+        metrics.incr("failures", stage="llm/parse", reason="missing_sections")
+    return recipe
@@ -0,0 +1,144 @@
+"""Start the slow lookups before the button is pressed.
+
+A link from the iPhone Shortcut is known the moment the page loads, yet the
+transcript fetch and model resolution used to wait for "Lets Do This!". The
+page calls prefetch_transcript()/prefetch_model() as soon as it has a usable
+URL and key; they start the work on a small process-wide pool and remember
+the Future. The button handler then calls take_transcript()/take_model(),
+which hand over the finished result, wait for the one in flight, or just do
+the work inline if nothing was started.
+
+Futures are shared by every session in the process and dropped after
+ENTRY_TTL seconds, or as soon as they finish with an error or a result
+that fails their validity check, so a failed prefetch is retried on the
+next click. Waiting on a Future is bounded by the stage's
+deadline.timeout(); one that overruns is dropped too.
+"""
+import hashlib
+import os
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+from chef_core import clients, deadline, metrics
+from chef_core.models import get_valid_model
+from chef_core.transcripts import TIMEOUT_ERROR, fetch_transcript, is_valid_transcript
+from chef_core.urls import canonical_video_key
+
+MAX_WORKERS = int(os.environ.get("CHEF_PREFETCH_WORKERS", 4))
+MAX_ENTRIES = 64
+ENTRY_TTL = 600.0   # seconds
+
+_executor = ThreadPoolExecutor(max_workers=MAX_WORKERS, thread_name_prefix="chef-prefetch")
+_lock = threading.Lock()
+_futures = OrderedDict()    # key -> (started, Future), oldest first
+
+
+def _expire(now):
+    while _futures:
+        key, (started, future) = next(iter(_futures.items()))
+        if now - started <= ENTRY_TTL and len(_futures) <= MAX_ENTRIES:
+            break
+        del _futures[key]
+
+
+def prefetch(key, fn, *args, valid=None):
+    """Run fn(*args) in the background unless `key` already has a result
+    or a call in flight. Returns the Future.
+
+    If it raises, or its result fails `valid`, the Future is forgotten as
+    soon as it finishes.
+    """
+    now = time.monotonic()
+    with _lock:
+        _expire(now)
+        entry = _futures.get(key)
+        if entry is not None:
+            return entry[1]
+        future = _executor.submit(metrics.in_context(fn), *args)
+        _futures[key] = (now, future)
+    metrics.incr("prefetch_started", kind=key[0])
+    future.add_done_callback(lambda done: _drop_failed(key, done, valid))
+    return future
+
+
+def _drop_failed(key, future, valid):
+    if future.cancelled() or future.exception() is not None:
+        failed = True
+    else:
+        failed = valid is not None and not valid(future.result())
+    if failed:
+        with _lock:
+            entry = _futures.get(key)
+            # A newer prefetch may already have taken the key
+            if entry is not None and entry[1] is future:
+                del _futures[key]
+
+
+def discard(key):
+    with _lock:
+        _futures.pop(key, None)
+
+
+def take(key, fn, *args, valid=None):
+    """The prefetched result for `key`, or fn(*args) if nothing was started.
+
+    Results failing `valid` (and exceptions) are forgotten after being
+    handed over, so the next call starts afresh.
+    """
+    with _lock:
+        entry = _futures.get(key)
+    if entry is None:
+        metrics.incr("prefetch", kind=key[0], result="miss")
+        return fn(*args)
+    future = entry[1]
+    metrics.incr("prefetch", kind=key[0], result="hit" if future.done() else "in_flight")
+    with metrics.span(f"prefetch/wait/{key[0]}"), deadline.guard(key[0]):
+        try:
+            result = future.result(timeout=deadline.timeout(key[0]))
+        except Exception:
+            future.cancel()
+            discard(key)
+            raise
+    if valid is not None and not valid(result):
+        discard(key)
+    return result
+
+
+def _transcript_key(url):
+    return ("transcript", canonical_video_key(url))
+
+
+def prefetch_transcript(url):
+    return prefetch(_transcript_key(url), fetch_transcript, url, valid=is_valid_transcript)
+
+
+def take_transcript(url):
+    try:
+        return take(_transcript_key(url), fetch_transcript, url, valid=is_valid_transcript)
+    except deadline.DeadlineExpired:
+        return TIMEOUT_ERROR
+
+
+def _resolve_model(api_key):
+    # Also pays for the google.generativeai import off the click path
+    clients.configure(api_key)
+    return get_valid_model()
+
+
+def _model_key(api_key):
+    return ("model", hashlib.sha256(api_key.encode("utf-8")).hexdigest()[:16])
+
+
+def prefetch_model(api_key):
+    return prefetch(_model_key(api_key), _resolve_model, api_key)
+
+
+def take_model(api_key):
+    """clients.configure(api_key) and get_valid_model(), prefetched or not."""
+    name = take(_model_key(api_key), _resolve_model, api_key)
+    # The prefetch configured the key process-wide, but another session's
+    # key may have been configured since
+    clients.configure(api_key)
+    return name
@@ -0,0 +1,245 @@
+import json
+
+from chef_core.condense import INGREDIENTS_MAX_TOKENS, condense_transcript
+
+SPLIT = "###SPLIT###"
+
+# Bump whenever RECIPE_PROMPT changes so cached extractions from the old
+# wording (or transcript condensing, or the local ingredient fast path)
+# aren't served for the new one.
+PROMPT_VERSION = 3
+
+# "Smart Estimate" Logic
+RECIPE_PROMPT = """
+                    You are a professional chef. Extract the recipe from this transcript.
+
+                    CRITICAL INSTRUCTION FOR INGREDIENTS:
+                    1. ACCURACY FIRST: If the transcript explicitly mentions a quantity (e.g., "2 cups", "10 oz", "a handful"), USE IT exactly. Do NOT label it as "Estimated".
+                    2. GAPS ONLY: Only if the transcript is completely silent on quantity, you must estimate it based on cooking ratios.
+                    3. LABELING: If you had to guess the quantity (Rule #2), prefix it with "(Est.)". If it was in the video, do NOT add a prefix.
+                    4. FORMAT: Always use "Quantity + Ingredient Name" (e.g., "12 oz Pasta").
+                    5. CLEANUP: Never list "to taste" or "garnish" as a separate line.
+
+                    OUTPUT FORMAT:
+
+                    SECTION 1: METADATA
+                    Format: "Difficulty | Time"
+                    Example: Easy | 15 Mins
+
+                    SECTION 2: INSTRUCTIONS
+                    Write a clean, numbered list of steps. Do NOT use the word "Section".
+
+                    SECTION 3: INGREDIENTS
+                    Format: Quantity + Item.
+                    Must be separated by the pipe symbol (|).
+
+                    SEPARATOR:
+                    Use "###SPLIT###" strictly between the three sections.
+
+                    Transcript: {transcript}
+                    """
+
+
+# Used when the ingredients were already extracted locally
+INSTRUCTIONS_PROMPT = """
+                    You are a professional chef. Extract the recipe from this transcript.
+                    The ingredient list is already done, so do NOT list ingredients.
+
+                    OUTPUT FORMAT:
+
+                    SECTION 1: METADATA
+                    Format: "Difficulty | Time"
+                    Example: Easy | 15 Mins
+
+                    SECTION 2: INSTRUCTIONS
+                    Write a clean, numbered list of steps. Do NOT use the word "Section".
+
+                    SEPARATOR:
+                    Use "###SPLIT###" strictly between the two sections.
+
+                    Transcript: {transcript}
+                    """
+
+
+# Compact structured mode: one JSON object with one-letter keys and bare
+# strings, so the output (which generation time scales with) stays small and
+# json.loads() replaces the section splitting. Bump the version whenever the
+# prompt or the layout changes.
+STRUCTURED_PROMPT_VERSION = f"{PROMPT_VERSION}-json-1"
+STRUCTURED_FIELDS = {
+    "m": ("meta", 'difficulty and total time as "Difficulty | Time", e.g. "Easy | 15 Mins"'),
+    "s": ("instructions", "the steps in order, one short sentence each, without numbers"),
+    "i": ("ingredients", 'one "Quantity Item" string per ingredient, e.g. "12 oz Pasta". Use quantities '
+                         'stated in the transcript exactly; only if it says nothing, estimate and start the '
+                         'string with "(Est.)". Never list "to taste" or "garnish" on their own'),
+}
+STRUCTURED_PROMPT = """
+                    You are a professional chef. Extract the recipe from this transcript.
+                    Reply with one JSON object with exactly these keys:
+                    {fields}
+
+                    Transcript: {transcript}
+                    """
+
+
+# Shopping-list-only prompt used by the simpler apps
+INGREDIENTS_PROMPT = """
+                    Extract ingredients from this transcript.
+                    Output ONLY a list of ingredients separated by a pipe symbol (|).
+                    Example: Eggs | Flour | Milk
+                    Transcript: {transcript}
+                    """
+
+
+def build_ingredients_prompt(transcript_text):
+    return INGREDIENTS_PROMPT.format(
+        transcript=condense_transcript(transcript_text, INGREDIENTS_MAX_TOKENS)
+    )
+
+
+def parse_ingredient_list(text):
+    return [item.strip() for item in text.split("|") if item.strip()]
+
+
+def build_recipe_prompt(transcript_text):
+    return RECIPE_PROMPT.format(transcript=condense_transcript(transcript_text))
+
+
+def build_instructions_prompt(transcript_text):
+    return INSTRUCTIONS_PROMPT.format(transcript=condense_transcript(transcript_text))
+
+
+def clean_ingredients(ingred):
+    """Turn the pipe/newline separated ingredients section into a list of items."""
+    items = []
+    for item in ingred.replace("\n", "|").split("|"):
+        clean_item = item.strip()
+        if clean_item and "Section" not in clean_item and "###" not in clean_item:
+            if clean_item.lower() == "to taste":
+                continue
+            items.append(clean_item)
+    return items
+
+
+class SectionSplitter:
+    """Incremental ###SPLIT### parser for streamed responses.
+
+    feed() returns the sections closed off by the chunk just received, and
+    close() returns whatever trails the last separator. The separator may be
+    cut across chunk boundaries.
+    """
+
+    def __init__(self, separator=SPLIT):
+        self.separator = separator
+        self._buffer = ""
+        self._scanned = 0  # Everything before this offset is known separator-free
+
+    def feed(self, chunk):
+        self._buffer += chunk
+        done = []
+        while True:
+            idx = self._buffer.find(self.separator, self._scanned)
+            if idx < 0:
+                self._scanned = max(0, len(self._buffer) - len(self.separator) + 1)
+                return done
+            done.append(self._buffer[:idx])
+            self._buffer = self._buffer[idx + len(self.separator):]
+            self._scanned = 0
+
+    def close(self):
+        tail, self._buffer, self._scanned = self._buffer, "", 0
+        return tail
+
+
+def has_sections(text, count):
+    """True if `text` splits into at least `count` ###SPLIT### sections, i.e.
+    the parsers below didn't have to fall back to dumping it all into the
+    instructions. Only such answers are worth caching."""
+    return text.count(SPLIT) >= count - 1
+
+
+def parse_recipe_response(text):
+    """Split a ###SPLIT### response into metadata, instructions and ingredients."""
+    parts = text.split(SPLIT)
+
+    if len(parts) >= 3:
+        meta = parts[0].strip()
+        instr = parts[1].strip()
+        ingred = parts[2].strip()
+    else:
+        meta = "Unknown | Unknown"
+        instr = text
+        ingred = ""
+
+    return {
+        "meta": meta,
+        "instructions": instr,
+        "ingredients": clean_ingredients(ingred),
+    }
+
+
+def parse_instructions_response(text):
+    """Metadata and instructions from an INSTRUCTIONS_PROMPT response."""
+    parts = text.split(SPLIT)
+    if len(parts) >= 2:
+        return {"meta": parts[0].strip(), "instructions": parts[1].strip()}
+    return {"meta": "Unknown | Unknown", "instructions": text}
+
+
+def structured_config(keys):
+    """generation_config asking for a JSON object with just `keys`."""
+    properties = {
+        key: {"type": "string"} if key == "m" else {"type": "array", "items": {"type": "string"}}
+        for key in keys
+    }
+    return {
+        "response_mime_type": "application/json",
+        "response_schema": {"type": "object", "properties": properties, "required": list(keys)},
+    }
+
+
+def build_structured_prompt(transcript_text, keys=tuple(STRUCTURED_FIELDS)):
+    """STRUCTURED_PROMPT for `keys`; a repair asks again for only the missing ones."""
+    fields = "\n                    ".join(f'"{key}": {STRUCTURED_FIELDS[key][1]}' for key in keys)
+    return STRUCTURED_PROMPT.format(fields=fields, transcript=condense_transcript(transcript_text))
+
+
+def _string_list(value):
+    if isinstance(value, str):
+        value = value.splitlines()
+    if not isinstance(value, list):
+        return None
+    return [item.strip() for item in value if isinstance(item, str) and item.strip()]
+
+
+def parse_structured_response(text, keys=tuple(STRUCTURED_FIELDS)):
+    """(recipe fields found, keys still missing) from a STRUCTURED_PROMPT answer.
+
+    One json.loads() and a type check per key; anything absent, empty or of
+    the wrong shape is reported missing so only that part gets re-requested.
+    """
+    try:
+        data = json.loads(text)
+    except ValueError:
+        return {}, list(keys)
+    if not isinstance(data, dict):
+        return {}, list(keys)
+
+    recipe, missing = {}, []
+    for key in keys:
+        value = data.get(key)
+        if key == "m":
+            value = value.strip() if isinstance(value, str) else None
+        else:
+            value = _string_list(value)
+        if not value:
+            missing.append(key)
+        elif key == "m":
+            recipe["meta"] = value
+        elif key == "s":
+            recipe["instructions"] = "\n".join(f"{n}. {step}" for n, step in enumerate(value, 1))
+        else:
+            recipe["ingredients"] = [
+                item for item in value if item.lower() != "to taste" and "###" not in item
+            ]
+    return recipe, missing
@@ -0,0 +1,178 @@
+"""Process-wide gate in front of every Gemini call.
+
+Every Streamlit session, batch.py worker and meal-plan batch shares one
+process, and with it one quota per API key. Calls go through submit(), which
+
+- waits for a token from that key's bucket (CHEF_GEMINI_RPM per minute,
+  bursts of up to CHEF_GEMINI_BURST), so a spike queues here instead of
+  coming back from Google as 429s;
+- retries quota and 5xx errors with full-jitter exponential backoff,
+  CHEF_GEMINI_RETRIES times;
+- coalesces identical requests: while a (model, prompt, key) call is in
+  flight, anyone asking for the same thing waits on it and gets the same
+  response (or the same exception) instead of spending quota on a duplicate.
+"""
+import hashlib
+import os
+import random
+import threading
+import time
+from concurrent.futures import Future
+
+from chef_core import deadline, metrics
+
+RATE_PER_MINUTE = float(os.environ.get("CHEF_GEMINI_RPM", 60))    # 0 turns the limit off
+BURST = int(os.environ.get("CHEF_GEMINI_BURST", 10))
+MAX_RETRIES = int(os.environ.get("CHEF_GEMINI_RETRIES", 4))
+BACKOFF_BASE = 1.0      # seconds, doubled per attempt
+BACKOFF_CAP = 20.0
+
+# google.api_core exception names (and HTTP codes) worth another go
+RETRYABLE_ERRORS = frozenset({
+    "ResourceExhausted", "TooManyRequests", "ServiceUnavailable", "InternalServerError",
+    "BadGateway", "GatewayTimeout", "DeadlineExceeded",
+})
+RETRYABLE_CODES = frozenset({429, 500, 502, 503, 504})
+
+
+class TokenBucket:
+    """Refills at `rate` tokens per second up to `capacity`.
+
+    acquire() reserves a token even when the bucket is empty (the balance
+    goes negative) and then sleeps outside the lock until it is due, so
+    waiters are served in arrival order without polling. A caller that
+    can't wait past `max_wait` seconds takes nothing and gets None instead.
+    """
+
+    def __init__(self, rate, capacity):
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = float(capacity)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self, max_wait=None):
+        """Take a token, blocking until there is one; returns seconds waited,
+        or None if that would be longer than `max_wait`."""
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            wait = (1 - self._tokens) / self.rate if self._tokens < 1 else 0.0
+            if max_wait is not None and wait > max_wait:
+                return None
+            self._tokens -= 1
+        if wait:
+            time.sleep(wait)
+        return wait
+
+
+def is_retryable(exc):
+    if type(exc).__name__ in RETRYABLE_ERRORS:
+        return True
+    code = getattr(exc, "code", None)
+    return isinstance(code, int) and code in RETRYABLE_CODES
+
+
+def backoff_delay(attempt):
+    """Full jitter: anywhere up to the exponential ceiling, so retries from
+    sessions that failed together don't all land together again."""
+    return random.uniform(0, min(BACKOFF_CAP, BACKOFF_BASE * 2 ** attempt))
+
+
+def key_digest(api_key):
+    """Short hash of an API key, so the raw secret never sits in a long-lived dict."""
+    return hashlib.sha256((api_key or "").encode("utf-8")).hexdigest()[:16]
+
+
+def request_key(model_name, prompt, *extra):
+    """Coalescing key; the prompt already embeds the (condensed) transcript.
+    `extra` holds anything else that changes the answer, e.g. the
+    generation config and key_digest() of the caller's API key."""
+    digest = hashlib.sha256()
+    for part in (model_name, prompt, *extra):
+        digest.update(part.encode("utf-8"))
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+class Scheduler:
+    def __init__(self, rate_per_minute=RATE_PER_MINUTE, burst=BURST, max_retries=MAX_RETRIES):
+        self.rate_per_minute = rate_per_minute
+        self.burst = burst
+        self.max_retries = max_retries
+        self._lock = threading.Lock()
+        self._buckets = {}      # hashed API key -> TokenBucket
+        self._inflight = {}     # request key -> Future
+
+    def _bucket(self, api_key):
+        name = key_digest(api_key)
+        with self._lock:
+            bucket = self._buckets.get(name)
+            if bucket is None:
+                bucket = self._buckets[name] = TokenBucket(self.rate_per_minute / 60.0, self.burst)
+            return bucket
+
+    def _call(self, fn, api_key):
+        attempt = 0
+        while True:
+            if self.rate_per_minute > 0:
+                waited = self._bucket(api_key).acquire(max_wait=deadline.remaining())
+                if waited is None:
+                    # Our turn would come after the deadline, don't queue for it
+                    deadline.record("llm")
+                    raise deadline.DeadlineExpired("llm")
+                if waited:
+                    metrics.observe("llm/rate_limit_wait", waited)
+            try:
+                return fn()
+            except Exception as e:
+                if attempt >= self.max_retries or not is_retryable(e):
+                    raise
+                delay = backoff_delay(attempt)
+                left = deadline.remaining()
+                if left is not None and delay >= left:
+                    raise  # No point sleeping past the deadline
+                metrics.incr("llm_retries", reason=type(e).__name__)
+                time.sleep(delay)
+                attempt += 1
+
+    def submit(self, fn, key=None, api_key=None):
+        """Run fn() under the rate limit and retry policy of `api_key`, the
+        key fn() calls Gemini with.
+
+        Calls sharing a non-None `key` while one of them is running share
+        that one call's outcome, so `key` should cover the API key too.
+        Streamed responses can only be consumed once, so pass key=None for
+        those.
+        """
+        if key is None:
+            return self._call(fn, api_key)
+
+        with self._lock:
+            future = self._inflight.get(key)
+            leader = future is None
+            if leader:
+                future = self._inflight[key] = Future()
+        if not leader:
+            metrics.incr("llm_coalesced")
+            return future.result(timeout=deadline.timeout("llm"))
+
+        try:
+            result = self._call(fn, api_key)
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            with self._lock:
+                del self._inflight[key]
+
+
+_scheduler = Scheduler()
+
+
+def get_scheduler():
+    return _scheduler
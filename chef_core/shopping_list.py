@@ -0,0 +1,96 @@
+"""The shopping list as one self-contained HTML snippet.
+
+Rendered in a single iframe, so ticking items off happens entirely in the
+browser: no rerun, no round trip, and no column/checkbox
+widgets to rebuild per ingredient. Check state is kept in localStorage
+(keyed by the list's content) when the browser allows it, so it survives a
+page reload too.
+"""
+import hashlib
+import html
+import urllib.parse
+
+from chef_core.urls import canonical_video_key
+
+INSTACART_SEARCH = "https://www.instacart.com/store/search?term="
+ROW_HEIGHT = 42
+PADDING = 24
+
+_STYLE = """
+<style>
+  body { margin: 0; font-family: "Source Sans Pro", sans-serif; }
+  ul { list-style: none; margin: 0; padding: 0; }
+  li { display: flex; align-items: center; justify-content: space-between;
+       height: 40px; border-bottom: 1px solid rgba(49, 51, 63, 0.1); }
+  label { display: flex; align-items: center; gap: 10px; cursor: pointer; flex: 1; }
+  input { width: 18px; height: 18px; accent-color: #FF4B4B; }
+  input:checked + span { text-decoration: line-through; opacity: 0.5; }
+  a { color: #FF4B4B; text-decoration: none; font-weight: 600; white-space: nowrap; padding-left: 12px; }
+</style>
+"""
+
+_SCRIPT = """
+<script>
+  (function () {
+    var key = "chef-list-%s", store = null, state = {};
+    try { store = window.localStorage; state = JSON.parse(store.getItem(key) || "{}"); } catch (e) {}
+    document.querySelectorAll("input[data-i]").forEach(function (box) {
+      box.checked = !!state[box.dataset.i];
+      box.addEventListener("change", function () {
+        state[box.dataset.i] = box.checked;
+        try { store && store.setItem(key, JSON.stringify(state)); } catch (e) {}
+      });
+    });
+  })();
+</script>
+"""
+
+
+def list_id(items):
+    return hashlib.sha1("\n".join(items).encode("utf-8")).hexdigest()[:12]
+
+
+def shopping_list_html(items, search_url=INSTACART_SEARCH):
+    rows = "".join(
+        f'<li><label><input type="checkbox" data-i="{i}"><span>{html.escape(item)}</span></label>'
+        f'<a href="{html.escape(search_url + urllib.parse.quote_plus(item))}" target="_blank" '
+        f'rel="noopener">Buy ↗️</a></li>'
+        for i, item in enumerate(items)
+    )
+    return f"{_STYLE}<ul>{rows}</ul>{_SCRIPT % list_id(items)}"
+
+
+def shopping_list_height(items):
+    return len(items) * ROW_HEIGHT + PADDING
+
+
+def render_shopping_list(items):
+    """Draw the list into the running Streamlit page."""
+    # Only the pages need Streamlit, batch.py and the benchmarks don't
+    import streamlit as st
+
+    html_doc, height = shopping_list_html(items), shopping_list_height(items)
+    if hasattr(st, "iframe"):
+        return st.iframe(html_doc, height=height)
+    # Streamlit releases before st.iframe
+    import streamlit.components.v1 as components
+    return components.html(html_doc, height=height)
+
+
+def session_shopping_list(video_url, rip=None):
+    """The list for `video_url` kept in this Streamlit session, so reruns
+    (and other links to the same video) don't rip it again.
+
+    On a miss, rip() is called if given, and what it returns is kept unless
+    it is None, which means rip() already showed the user what went wrong.
+    """
+    import streamlit as st
+
+    lists = st.session_state.setdefault("shopping_lists", {})
+    key = canonical_video_key(video_url) if video_url else None
+    if key in lists:
+        return lists[key]
+    items = rip() if rip is not None else None
+    if items is not None and key is not None:
+        lists[key] = items
+    return items
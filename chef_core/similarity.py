@@ -0,0 +1,245 @@
+"""Near-duplicate transcripts: reuse a recipe extracted from a re-upload.
+
+The recipe cache is keyed on an exact content hash, so a re-upload or the
+same recipe with a different intro misses it. Here each transcript we
+extracted a recipe from gets a MinHash signature over word shingles of its
+condensed text, stored in SQLite next to the caches with an LSH band index.
+Before calling Gemini, the pipeline asks for a stored transcript whose
+estimated Jaccard similarity is at least CHEF_SIMILARITY_THRESHOLD and, if
+its recipe is still cached, serves that.
+Similarity is over the whole condensed text, so a short cut from a longer
+video only matches when it covers most of the same recipe.
+
+Knobs:
+    CHEF_SIMILARITY_THRESHOLD     minimum estimated similarity (default 0.8)
+    CHEF_SIMILARITY_PERMUTATIONS  signature length; memory and accuracy
+                                  both scale with it (default 128)
+    CHEF_SIMILARITY_ROWS          rows per LSH band; more rows means fewer,
+                                  stricter candidates (default 4)
+    CHEF_SIMILARITY_MAX_DOCS      transcripts kept, oldest dropped first;
+                                  0 turns the index off (default 5000)
+"""
+import functools
+import hashlib
+import os
+import re
+import sqlite3
+import struct
+import threading
+import time
+
+from chef_core import metrics
+from chef_core.cache import CACHE_DIR, get_cached_recipe
+from chef_core.condense import condense_transcript
+
+THRESHOLD = float(os.environ.get("CHEF_SIMILARITY_THRESHOLD", 0.8))
+NUM_PERM = int(os.environ.get("CHEF_SIMILARITY_PERMUTATIONS", 128))
+ROWS = int(os.environ.get("CHEF_SIMILARITY_ROWS", 4))
+MAX_DOCS = int(os.environ.get("CHEF_SIMILARITY_MAX_DOCS", 5000))
+SHINGLE_WORDS = 5
+
+_VALUE_BITS = 48     # per-bin minimum; the bits above count densification steps
+_WORD = re.compile(r"[a-z0-9']+")
+
+
+def shingles(text):
+    """64-bit hashes of every SHINGLE_WORDS-word run, case and punctuation ignored."""
+    words = _WORD.findall(text.lower())
+    if len(words) < SHINGLE_WORDS:
+        words = words + [""] * (SHINGLE_WORDS - len(words))
+    return {
+        int.from_bytes(hashlib.blake2b(" ".join(words[i:i + SHINGLE_WORDS]).encode(), digest_size=8).digest(), "big")
+        for i in range(len(words) - SHINGLE_WORDS + 1)
+    }
+
+
+def minhash(hashes, num_perm=NUM_PERM):
+    """MinHash signature by one permutation hashing.
+
+    Each shingle hash is used once: it picks one of `num_perm` bins and
+    competes for that bin's minimum, so the signature costs one pass over
+    the shingles instead of one pass per permutation. Bins nobody landed in
+    borrow the next filled bin's value (rotation densification), tagged
+    with the distance so borrowed values only match the same borrow.
+    """
+    bins = [None] * num_perm
+    for h in hashes:
+        slot = h % num_perm
+        value = (h // num_perm) & ((1 << _VALUE_BITS) - 1)
+        if bins[slot] is None or value < bins[slot]:
+            bins[slot] = value
+    if all(value is None for value in bins):
+        return [0] * num_perm
+    signature = []
+    for slot in range(num_perm):
+        step = 0
+        while bins[(slot + step) % num_perm] is None:
+            step += 1
+        signature.append(bins[(slot + step) % num_perm] | (step << _VALUE_BITS))
+    return signature
+
+
+@functools.lru_cache(maxsize=32)
+def transcript_signature(transcript_text, num_perm=NUM_PERM):
+    """Signature of the condensed transcript, so stray intros/outros the
+    condenser drops don't count against a match. Memoized because the
+    lookup and the later add() see the same text."""
+    return tuple(minhash(shingles(condense_transcript(transcript_text)), num_perm))
+
+
+def estimate_similarity(a, b):
+    return sum(x == y for x, y in zip(a, b)) / len(a)
+
+
+def _pack(signature):
+    return struct.pack(f"<{len(signature)}Q", *signature)
+
+
+def _unpack(blob):
+    return struct.unpack(f"<{len(blob) // 8}Q", blob)
+
+
+class SimilarityIndex:
+    """MinHash signatures plus LSH bands in SQLite.
+
+    Each document is stored under a `variant` (prompt version and model),
+    and only documents of the same variant match, so a reused recipe always
+    has the shape the caller expects.
+    """
+
+    def __init__(self, path, num_perm=NUM_PERM, rows=ROWS, threshold=THRESHOLD, max_docs=MAX_DOCS):
+        self.num_perm = num_perm
+        self.rows = rows
+        self.bands = num_perm // rows
+        self.threshold = threshold
+        self.max_docs = max_docs
+        self._lock = threading.Lock()
+
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS similarity_docs ("
+            "id INTEGER PRIMARY KEY, variant TEXT NOT NULL, recipe_key TEXT NOT NULL, "
+            "signature BLOB NOT NULL, created REAL NOT NULL)"
+        )
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS similarity_bands ("
+            "band INTEGER NOT NULL, bucket INTEGER NOT NULL, doc INTEGER NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS similarity_bands_lookup ON similarity_bands(band, bucket)")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS similarity_bands_doc ON similarity_bands(doc)")
+
+    def _variant(self, variant):
+        # A different signature layout can't be compared, keep them apart
+        return f"{variant}|{self.num_perm}x{self.rows}"
+
+    def _buckets(self, signature):
+        for band in range(self.bands):
+            chunk = _pack(signature[band * self.rows:(band + 1) * self.rows])
+            yield band, int.from_bytes(hashlib.blake2b(chunk, digest_size=7).digest(), "big")
+
+    def query(self, signature, variant):
+        """(recipe key, estimated similarity) of the best match at or over
+        the threshold, or None."""
+        variant = self._variant(variant)
+        with self._lock:
+            candidates = set()
+            for band, bucket in self._buckets(signature):
+                candidates.update(
+                    row[0] for row in self._conn.execute(
+                        "SELECT doc FROM similarity_bands WHERE band = ? AND bucket = ?", (band, bucket)
+                    )
+                )
+            best = None
+            for doc in candidates:
+                row = self._conn.execute(
+                    "SELECT recipe_key, signature FROM similarity_docs WHERE id = ? AND variant = ?",
+                    (doc, variant),
+                ).fetchone()
+                if row is None:
+                    continue
+                score = estimate_similarity(signature, _unpack(row[1]))
+                if score >= self.threshold and (best is None or score > best[1]):
+                    best = (row[0], score)
+        return best
+
+    def add(self, signature, variant, recipe_key):
+        with self._lock:
+            cur = self._conn.execute(
+                "INSERT INTO similarity_docs (variant, recipe_key, signature, created) VALUES (?, ?, ?, ?)",
+                (self._variant(variant), recipe_key, _pack(signature), time.time()),
+            )
+            self._conn.executemany(
+                "INSERT INTO similarity_bands (band, bucket, doc) VALUES (?, ?, ?)",
+                [(band, bucket, cur.lastrowid) for band, bucket in self._buckets(signature)],
+            )
+            self._evict()
+
+    def _evict(self):
+        count = self._conn.execute("SELECT COUNT(*) FROM similarity_docs").fetchone()[0]
+        if count <= self.max_docs:
+            return
+        doomed = [
+            (row[0],) for row in self._conn.execute(
+                "SELECT id FROM similarity_docs ORDER BY created LIMIT ?", (count - self.max_docs,)
+            )
+        ]
+        self._conn.executemany("DELETE FROM similarity_bands WHERE doc = ?", doomed)
+        self._conn.executemany("DELETE FROM similarity_docs WHERE id = ?", doomed)
+
+    def stats(self):
+        with self._lock:
+            docs = self._conn.execute("SELECT COUNT(*) FROM similarity_docs").fetchone()[0]
+        return {
+            "docs": docs,
+            "max_docs": self.max_docs,
+            "signature_bytes": self.num_perm * 8,
+            "bands": self.bands,
+            "rows": self.rows,
+            "threshold": self.threshold,
+        }
+
+
+_index = None
+_index_lock = threading.Lock()
+
+
+def get_index():
+    """The shared index, or None when CHEF_SIMILARITY_MAX_DOCS is 0."""
+    global _index
+    if MAX_DOCS <= 0:
+        return None
+    with _index_lock:
+        if _index is None:
+            _index = SimilarityIndex(os.path.join(CACHE_DIR, "similarity.sqlite3"))
+        return _index
+
+
+def similar_recipe(transcript_text, prompt_version, model_name):
+    """A cached recipe from a near-duplicate transcript, or None."""
+    index = get_index()
+    if index is None:
+        return None
+    with metrics.span("similarity/query"):
+        match = index.query(transcript_signature(transcript_text, index.num_perm), f"{prompt_version}:{model_name}")
+    recipe = get_cached_recipe(match[0]) if match else None
+    if recipe is not None and not recipe.get("ingredients"):
+        # Left by a failed parse before those stopped being cached; a
+        # near-duplicate shouldn't inherit it
+        metrics.incr("similarity", result="incomplete")
+        return None
+    metrics.incr("similarity", result="hit" if recipe is not None else ("evicted" if match else "miss"))
+    return recipe
+
+
+def remember_transcript(transcript_text, prompt_version, model_name, recipe_key):
+    """Index a transcript whose recipe was just stored under `recipe_key`.
+    Only call this for complete recipes, since every near-duplicate will be
+    served the same one."""
+    index = get_index()
+    if index is None:
+        return
+    with metrics.span("similarity/add"):
+        index.add(transcript_signature(transcript_text, index.num_perm), f"{prompt_version}:{model_name}", recipe_key)
@@ -0,0 +1,165 @@
+from chef_core import clients, deadline, metrics
+from chef_core.cache import cached_caption_tracks, cached_transcript, forget_caption_tracks
+from chef_core.captions import join_caption_lines, parse_captions
+from chef_core.hedging import HedgedRunner
+from chef_core.http_session import get_session
+from chef_core.urls import extract_youtube_id
+
+
+@metrics.span("transcript/youtube_api")
+def youtube_api_transcript(url):
+    """STRATEGY A: YouTube Native API. Raises on any failure."""
+    video_id = extract_youtube_id(url)
+    if not video_id:
+        raise ValueError("Could not find a YouTube video ID in that link.")
+    with deadline.guard("transcript"):
+        return join_caption_lines(clients.fetch_youtube_transcript(video_id))
+
+
+IPHONE_USER_AGENT = 'Mozilla/5.0 (iPhone; CPU iPhone OS 17_0 like Mac OS X) AppleWebKit/605.1.15 (KHTML, like Gecko) Version/17.0 Mobile/15E148 Safari/604.1'
+
+
+# Only the caption lists are read from the probe, so leave out the DASH and
+# HLS manifests (extra requests each) and skip format selection entirely
+PROBE_EXTRACTOR_ARGS = {'youtube': {'skip': ['dash', 'hls']}}
+
+
+def probe_captions(url):
+    """yt-dlp metadata lookup: {lang: [{"ext", "url"}, ...]} or None."""
+    ydl_opts = {
+        'skip_download': True,
+        'quiet': True,
+        'no_warnings': True,
+        'nocheckcertificate': True,
+        'user_agent': IPHONE_USER_AGENT,
+        'extractor_args': PROBE_EXTRACTOR_ARGS,
+        'socket_timeout': deadline.timeout("transcript"),
+    }
+    with clients.youtube_dl_class()(ydl_opts) as ydl, metrics.span("ytdlp/extract_info"), \
+            deadline.guard("transcript"):
+        info = ydl.extract_info(url, download=False, process=False)
+        if info.get('_type') in ('url', 'url_transparent'):
+            # Redirect to another extractor, which only processing follows
+            info = ydl.process_ie_result(info, download=False)
+    captions = info.get('subtitles') or info.get('automatic_captions')
+    if not captions:
+        return None
+    # Just what pick_caption_track() needs, this is what gets cached: auto
+    # captions list ~150 machine-translated languages, and we read one
+    lang = pick_caption_language(captions)
+    formats = [{'ext': fmt.get('ext'), 'url': fmt['url']} for fmt in captions[lang] if fmt.get('url')]
+    return {lang: formats} if formats else None
+
+
+def pick_caption_language(captions):
+    """English if there is any, otherwise the first language."""
+    if 'en' in captions:
+        return 'en'
+    for code in captions:
+        if code.startswith('en'):
+            return code
+    return next(iter(captions))
+
+
+def pick_caption_track(captions):
+    """The track of pick_caption_language(), json3 preferred."""
+    cap_formats = captions[pick_caption_language(captions)]
+    track = cap_formats[0]
+    for fmt in cap_formats:
+        if fmt['ext'] == 'json3':
+            track = fmt
+            break
+    return track
+
+
+def download_captions(track):
+    headers = {'User-Agent': IPHONE_USER_AGENT}
+    with metrics.span("ytdlp/caption_download"), deadline.guard("captions"):
+        response = get_session().get(track['url'], headers=headers, timeout=deadline.timeout("captions"))
+    if response.status_code != 200:
+        metrics.incr("failures", stage="ytdlp/caption_download", status=response.status_code)
+        return "Error: Could not download caption data."
+    with metrics.span("captions/parse"):
+        text = parse_captions(response.text, track.get('ext'))
+    if not text.strip():
+        metrics.incr("failures", stage="captions/parse", reason="empty")
+        return "Error: The captions were empty."
+    return text
+
+
+@metrics.span("transcript/ytdlp")
+def ytdlp_transcript(url):
+    # STRATEGY B: The Disguised Downloader
+    try:
+        captions = cached_caption_tracks(url, probe_captions)
+        if not captions:
+            metrics.incr("failures", stage="transcript/ytdlp", reason="no_captions")
+            return "Error: No captions found."
+        text = download_captions(pick_caption_track(captions))
+        if text.startswith("Error"):
+            # Signed URLs can go stale early; probe afresh next time
+            forget_caption_tracks(url)
+        return text
+    except Exception as e:
+        metrics.incr("failures", stage="transcript/ytdlp", reason=type(e).__name__)
+        if deadline.is_timeout(e):
+            if not isinstance(e, deadline.DeadlineExpired):
+                # The guards count the ones they convert, this one got past them
+                deadline.record("transcript")
+            return TIMEOUT_ERROR
+        return f"Download Error: {e}"
+
+
+@metrics.span("transcript/pytube")
+def pytube_transcript(url):
+    """pytubefix captions, for when youtube-transcript-api is broken locally.
+
+    Returns None when the video has no English captions.
+    """
+    yt = clients.pytube_class()(url)
+    # Get English captions (auto-generated or manual)
+    caption = yt.captions.get_by_language_code('en')
+    if not caption:
+        # Try 'a.en' (auto-generated english) if 'en' fails
+        caption = yt.captions.get_by_language_code('a.en')
+    if not caption:
+        return None
+    # Convert XML to pure text (also drops rolling duplicate lines)
+    return parse_captions(caption.xml_captions, "xml")
+
+
+TIMEOUT_ERROR = "Error: Timed out getting the transcript."
+
+
+def is_valid_transcript(text):
+    return bool(text) and "Error" not in text
+
+
+_runner = HedgedRunner()
+
+
+@metrics.span("transcript/race")
+def get_stealth_transcript(url):
+    """Race the transcript strategies that apply to `url`.
+
+    For YouTube the native API and yt-dlp are hedged against each other in
+    whichever order has been fastest lately; other hosts only have yt-dlp.
+    """
+    strategies = [("ytdlp", ytdlp_transcript)]
+    if ("youtube.com" in url or "youtu.be" in url) and clients.is_installed("youtube_transcript_api"):
+        strategies.insert(0, ("youtube_api", youtube_api_transcript))
+    try:
+        with deadline.guard("transcript"):
+            result = _runner.run(url, strategies, is_valid_transcript, timeout=deadline.timeout("transcript"))
+    except deadline.DeadlineExpired:
+        return TIMEOUT_ERROR
+    return result if result is not None else "Error: No captions found."
+
+
+def strategy_stats():
+    return _runner.snapshot()
+
+
+def fetch_transcript(url):
+    """get_stealth_transcript() behind the shared on-disk transcript cache."""
+    return cached_transcript(url, get_stealth_transcript)
@@ -0,0 +1,59 @@
+import re
+import urllib.parse
+
+VIDEO_HOSTS = ("youtube.com", "youtu.be", "instagram.com", "tiktok.com")
+_YOUTUBE_ID = re.compile(r"[A-Za-z0-9_-]{11}")
+
+
+def _split(url):
+    url = url.strip()
+    if "://" not in url:
+        url = f"https://{url}"     # "youtu.be/abc" pasted without a scheme
+    return urllib.parse.urlsplit(url)
+
+
+def _on_host(host, domain):
+    return host == domain or host.endswith(f".{domain}")
+
+
+def extract_youtube_id(url):
+    """Video ID of a youtube.com/youtu.be link, None for any other host."""
+    parts = _split(url)
+    host = (parts.hostname or "").lower()
+    segments = [s for s in parts.path.split("/") if s]
+    if _on_host(host, "youtu.be"):
+        return segments[0] if segments else None
+    if not _on_host(host, "youtube.com"):
+        return None
+    if len(segments) >= 2 and segments[0] == "shorts":
+        return segments[1]
+    ids = urllib.parse.parse_qs(parts.query).get("v")
+    return ids[0] if ids else None
+
+
+def canonical_video_key(url):
+    """Stable cache key for a video link.
+
+    YouTube links collapse to their video ID, so youtu.be, watch?v= and
+    shorts/ links for the same video share one entry. Anything else
+    (Instagram, TikTok) is keyed on host + path with tracking params dropped.
+    """
+    video_id = extract_youtube_id(url)
+    if video_id:
+        return f"yt:{video_id}"
+    parts = _split(url)
+    host = (parts.hostname or "").lower().removeprefix("www.").removeprefix("m.")
+    return f"url:{host}{parts.path.rstrip('/')}"
+
+
+def is_video_url(url):
+    """Cheap check that `url` is a complete link to a video we can read,
+    so nothing gets started for a half-typed one."""
+    parts = urllib.parse.urlsplit(url.strip())
+    host = (parts.hostname or "").lower()
+    if parts.scheme not in ("http", "https") or not any(_on_host(host, name) for name in VIDEO_HOSTS):
+        return False
+    if "youtu" in host:
+        video_id = extract_youtube_id(url)
+        return bool(video_id and _YOUTUBE_ID.fullmatch(video_id))
+    return bool(parts.path.strip("/"))
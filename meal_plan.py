@@ -0,0 +1,58 @@
+import streamlit as st
+import urllib.parse
+from concurrent.futures import ThreadPoolExecutor
+from chef_core import clients, metrics
+from chef_core.mealplan import extract_meal_plan, merge_shopping_lists
+from chef_core.models import get_valid_model
+from chef_core.transcripts import fetch_transcript
+
+MAX_FETCHES = 8
+
+st.set_page_config(page_title="Chef Vibe: Meal Plan", page_icon="🗓️")
+st.title("🗓️ Chef Vibe: Meal Plan")
+
+if "GEMINI_KEY" in st.secrets:
+    api_key = st.secrets["GEMINI_KEY"]
+else:
+    api_key = st.text_input("Enter Gemini API Key:", type="password")
+
+urls_text = st.text_area("Paste one link per line (YouTube, Instagram, TikTok):", height=180)
+
+def fetch_all(urls):
+    # Every link at once, the slow part is waiting on YouTube
+    with ThreadPoolExecutor(max_workers=min(MAX_FETCHES, len(urls))) as pool:
+        return list(pool.map(metrics.in_context(fetch_transcript), urls))
+
+if st.button("Plan My Week 🛒"):
+    urls = list(dict.fromkeys(line.strip() for line in urls_text.splitlines() if line.strip()))
+    if not api_key or not urls:
+        st.error("Missing Info!")
+    else:
+        with st.spinner(f"Fetching {len(urls)} transcripts..."):
+            transcripts = fetch_all(urls)
+
+        found = []
+        for url, text in zip(urls, transcripts):
+            if "Error" in text:
+                st.warning(f"{url}: {text}")
+            else:
+                found.append((url, text))
+
+        if found:
+            try:
+                clients.configure(api_key)
+                with st.spinner(f"Chef is planning {len(found)} recipes..."):
+                    recipes = extract_meal_plan([text for _, text in found], get_valid_model())
+
+                st.subheader("📝 Recipes")
+                for (url, _), recipe in zip(found, recipes):
+                    with st.expander(f"{recipe['meta']} — {url}"):
+                        st.markdown(recipe["instructions"])
+
+                # One list for the whole week, same ingredient summed across recipes
+                st.subheader("🛒 Shopping List")
+                for item in merge_shopping_lists(recipe["ingredients"] for recipe in recipes):
+                    query = urllib.parse.quote(item)
+                    st.markdown(f"• **{item}** — [**Buy ↗️**](https://www.instacart.com/store/s?k={query})")
+            except Exception as e:
+                st.error(f"AI Error: {e}")
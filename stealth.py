@@ -1,13 +1,11 @@
 import streamlit as st
-import google.generativeai as genai
-import requests
-from yt_dlp import YoutubeDL
+import os
 import urllib.parse
-# Wrap import to prevent crash if library is missing
-try:
-    from youtube_transcript_api import YouTubeTranscriptApi
-except ImportError:
-    YouTubeTranscriptApi = None
+from chef_core import deadline, metrics
+from chef_core.mapreduce import extract_recipe_chunked
+from chef_core.pipeline import extract_recipe, extract_recipe_structured, partial_recipe, stream_recipe
+from chef_core.prefetch import prefetch_model, prefetch_transcript, take_model, take_transcript
+from chef_core.urls import is_video_url
 
 # --- 1. CONFIGURATION ---
 st.set_page_config(
@@ -65,6 +63,8 @@ st.markdown("""
 # Capture URL from iPhone Shortcut
 params = st.query_params
 url_from_iphone = params.get("url", "")
+# ?debug=1 (or CHEF_DEBUG=1) shows where the time went under the recipe
+debug_mode = params.get("debug") == "1" or os.environ.get("CHEF_DEBUG") == "1"
 
 st.title("🥂 Chef Vibe")
 
@@ -77,183 +77,117 @@ else:
 # --- 3. INPUT ---
 video_url = st.text_input("Paste Link (YouTube, Instagram, TikTok):", value=url_from_iphone)
 
-# --- 4. HELPER FUNCTIONS ---
-def get_valid_model():
-    try:
-        for m in genai.list_models():
-            if 'generateContent' in m.supported_generation_methods:
-                if 'gemini' in m.name: return m.name
-        return 'models/gemini-pro'
-    except:
-        return 'gemini-pro'
+stream_mode = st.toggle("Show sections as they're ready", value=True)
+long_video_mode = st.toggle("Long video mode (read the whole transcript)", value=False)
+structured_mode = st.toggle("Compact mode (structured answer, faster)", value=False)
 
-def extract_youtube_id(url):
-    if "youtu.be" in url: return url.split("/")[-1].split("?")[0]
-    if "v=" in url: return url.split("v=")[1].split("&")[0]
-    return None
+# Get the transcript and model going while the user is still reading the page
+if video_url and is_video_url(video_url):
+    prefetch_transcript(video_url)
+if api_key:
+    prefetch_model(api_key)
 
-def get_stealth_transcript(url):
-    transcript_text = None
-    
-    # STRATEGY A: YouTube Native API
-    if ("youtube.com" in url or "youtu.be" in url) and YouTubeTranscriptApi:
-        try:
-            video_id = extract_youtube_id(url)
-            if video_id:
-                transcript_list = YouTubeTranscriptApi.get_transcript(video_id)
-                transcript_text = " ".join([entry['text'] for entry in transcript_list])
-                return transcript_text
-        except Exception:
-            pass # Fallback to Strategy B
-
-    # STRATEGY B: The Disguised Downloader
-    ydl_opts = {
-        'skip_download': True,
-        'quiet': True,
-        'no_warnings': True,
-        'nocheckcertificate': True,
-        'user_agent': 'Mozilla/5.0 (iPhone; CPU iPhone OS 17_0 like Mac OS X) AppleWebKit/605.1.15 (KHTML, like Gecko) Version/17.0 Mobile/15E148 Safari/604.1',
-    }
-    
-    try:
-        with YoutubeDL(ydl_opts) as ydl:
-            info = ydl.extract_info(url, download=False)
-            captions = info.get('subtitles') or info.get('automatic_captions')
-            
-            if not captions: return "Error: No captions found."
-
-            lang = 'en'
-            if 'en' not in captions:
-                for code in captions:
-                    if code.startswith('en'):
-                        lang = code
-                        break
-                else:
-                    lang = list(captions.keys())[0]
-
-            cap_formats = captions[lang]
-            json_url = None
-            for fmt in cap_formats:
-                if fmt['ext'] == 'json3':
-                    json_url = fmt['url']
-                    break
-            if not json_url: json_url = cap_formats[0]['url']
-
-            headers = {'User-Agent': ydl_opts['user_agent']}
-            response = requests.get(json_url, headers=headers)
-            
-            try:
-                data = response.json()
-                events = data.get('events', [])
-                full_text = []
-                for event in events:
-                    segs = event.get('segs', [])
-                    for seg in segs:
-                        if seg.get('utf8'): full_text.append(seg['utf8'])
-                return " ".join(full_text)
-            except:
-                return response.text
-    except Exception as e:
-        return f"Download Error: {e}"
+# --- 4. DISPLAY HELPERS ---
+def render_meta(meta):
+    if "|" in meta:
+        diff, time = meta.split("|", 1)
+    else:
+        diff, time = meta, ""
+
+    c1, c2 = st.columns(2)
+    c1.info(f"**Level:** {diff.strip()}")
+    c2.success(f"**Time:** {time.strip()}")
+
+    st.divider()
+
+def render_instructions(instr):
+    st.subheader("📝 Instructions")
+    st.markdown(instr)
+
+    st.divider()
+
+def render_ingredients(ingredients):
+    # SHOPPING LIST (Mobile Optimized)
+    st.subheader("🛒 Shopping List")
+
+    for clean_item in ingredients:
+        # Encode for URL
+        query = urllib.parse.quote(clean_item)
+        url = f"https://www.instacart.com/store/s?k={query}"
+
+        # MOBILE FIX: Use Markdown link to keep buy button inline
+        st.markdown(f"• **{clean_item}** — [**Buy ↗️**]({url})")
+
+RENDERERS = {
+    "meta": render_meta,
+    "instructions": render_instructions,
+    "ingredients": render_ingredients,
+}
+
+def render(section, value):
+    with metrics.span(f"render/{section}"):
+        RENDERERS[section](value)
+    rendered.add(section)
+
+def render_partial(transcript_text):
+    # Out of time: fill in whatever Gemini didn't get to from the transcript alone
+    st.warning("⏳ Chef ran out of time, here's what we could get without the AI. Try again for the full recipe.")
+    recipe = partial_recipe(transcript_text)
+    for section in RENDERERS:
+        if section not in rendered and recipe[section]:
+            render(section, recipe[section])
+    with st.expander("📜 Transcript"):
+        st.write(transcript_text)
+
+def render_debug(request_trace):
+    with st.expander("⏱️ Timings"):
+        st.code(metrics.format_waterfall(request_trace), language=None)
+        if request_trace.counters:
+            st.json(request_trace.counters)
+        st.download_button("Prometheus metrics", metrics.prometheus_text(), file_name="chef-metrics.prom")
 
 # --- 5. APP LOGIC ---
 if st.button("Lets Do This! 🚀"):
     if not api_key or not video_url:
         st.error("Missing Info!")
     else:
-        with st.spinner("Finding recipe..."):
-            transcript_text = get_stealth_transcript(video_url)
-
-        if "Error" in transcript_text:
-            st.error(transcript_text)
-        else:
-            try:
-                genai.configure(api_key=api_key)
-                valid_model_name = get_valid_model()
-                
-                with st.spinner("Chef is writing the shopping list..."):
-                    model = genai.GenerativeModel(valid_model_name)
-                    
-                    # UPDATED PROMPT: "Smart Estimate" Logic
-                    prompt = f"""
-                    You are a professional chef. Extract the recipe from this transcript.
-                    
-                    CRITICAL INSTRUCTION FOR INGREDIENTS:
-                    1. ACCURACY FIRST: If the transcript explicitly mentions a quantity (e.g., "2 cups", "10 oz", "a handful"), USE IT exactly. Do NOT label it as "Estimated".
-                    2. GAPS ONLY: Only if the transcript is completely silent on quantity, you must estimate it based on cooking ratios.
-                    3. LABELING: If you had to guess the quantity (Rule #2), prefix it with "(Est.)". If it was in the video, do NOT add a prefix.
-                    4. FORMAT: Always use "Quantity + Ingredient Name" (e.g., "12 oz Pasta").
-                    5. CLEANUP: Never list "to taste" or "garnish" as a separate line.
-                    
-                    OUTPUT FORMAT:
-                    
-                    SECTION 1: METADATA
-                    Format: "Difficulty | Time"
-                    Example: Easy | 15 Mins
-                    
-                    SECTION 2: INSTRUCTIONS
-                    Write a clean, numbered list of steps. Do NOT use the word "Section".
-                    
-                    SECTION 3: INGREDIENTS
-                    Format: Quantity + Item.
-                    Must be separated by the pipe symbol (|).
-                    
-                    SEPARATOR:
-                    Use "###SPLIT###" strictly between the three sections.
-                    
-                    Transcript: {transcript_text[:15000]}
-                    """
-                    
-                    response = model.generate_content(prompt)
-                    parts = response.text.split("###SPLIT###")
-                    
-                    if len(parts) >= 3:
-                        meta = parts[0].strip()
-                        instr = parts[1].strip()
-                        ingred = parts[2].strip()
+        rendered = set()
+        with metrics.trace("lets_do_this") as request_trace, deadline.budget():
+            with st.spinner("Finding recipe..."):
+                transcript_text = take_transcript(video_url)
+
+            if "Error" in transcript_text:
+                st.error(transcript_text)
+            else:
+                try:
+                    valid_model_name = take_model(api_key)
+
+                    with st.spinner("Chef is writing the shopping list..."):
+                        if long_video_mode:
+                            # Whole transcript, chunked and extracted in parallel
+                            recipe = extract_recipe_chunked(transcript_text, valid_model_name)
+                            for section in RENDERERS:
+                                render(section, recipe[section])
+                        elif structured_mode:
+                            # One JSON answer, only missing parts asked for again
+                            recipe = extract_recipe_structured(transcript_text, valid_model_name)
+                            for section in RENDERERS:
+                                render(section, recipe[section])
+                        elif stream_mode:
+                            # Each section renders the moment its ###SPLIT### arrives
+                            for section, value in stream_recipe(transcript_text, valid_model_name):
+                                render(section, value)
+                        else:
+                            recipe = extract_recipe(transcript_text, valid_model_name)
+                            for section in RENDERERS:
+                                render(section, recipe[section])
+
+                except Exception as e:
+                    metrics.incr("failures", stage="recipe", reason=type(e).__name__)
+                    if deadline.is_timeout(e):
+                        render_partial(transcript_text)
                     else:
-                        meta = "Unknown | Unknown"
-                        instr = response.text
-                        ingred = ""
+                        st.error(f"AI Error: {e}")
 
-                    # --- UI DISPLAY ---
-                    
-                    # 1. METADATA
-                    if "|" in meta:
-                        diff, time = meta.split("|", 1)
-                    else:
-                        diff, time = meta, ""
-                        
-                    c1, c2 = st.columns(2)
-                    c1.info(f"**Level:** {diff.strip()}")
-                    c2.success(f"**Time:** {time.strip()}")
-                    
-                    st.divider()
-                    
-                    # 2. INSTRUCTIONS
-                    st.subheader("📝 Instructions")
-                    st.markdown(instr)
-                    
-                    st.divider()
-                    
-                    # 3. SHOPPING LIST (Mobile Optimized)
-                    st.subheader("🛒 Shopping List")
-                    
-                    clean_ingred = ingred.replace("\n", "|").split("|")
-                    
-                    for item in clean_ingred:
-                        clean_item = item.strip()
-                        if clean_item and "Section" not in clean_item and "###" not in clean_item:
-                            
-                            if clean_item.lower() == "to taste":
-                                continue
-                                
-                            # Encode for URL
-                            query = urllib.parse.quote(clean_item)
-                            url = f"https://www.instacart.com/store/s?k={query}"
-                            
-                            # MOBILE FIX: Use Markdown link to keep buy button inline
-                            st.markdown(f"• **{clean_item}** — [**Buy ↗️**]({url})")
-                            
-            except Exception as e:
-                st.error(f"AI Error: {e}")
\ No newline at end of file
+        if debug_mode:
+            render_debug(request_trace)
\ No newline at end of file
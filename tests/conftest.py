@@ -0,0 +1,7 @@
+import os
+import sys
+import tempfile
+
+# Keep the on-disk caches out of ~/.cache while the suite imports chef_core
+os.environ.setdefault("CHEF_CACHE_DIR", tempfile.mkdtemp(prefix="chef-vibe-tests-"))
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,62 @@
+from chef_core.captions import RollingJoiner, parse_captions, sniff_format
+
+
+def test_vtt():
+    payload = (
+        "WEBVTT\nKind: captions\nLanguage: en\n\nNOTE a comment\n\n"
+        "00:00:00.000 --> 00:00:02.000 align:start\n<c>add</c> two cups flour\n\n"
+        "00:00:02.000 --> 00:00:04.000\nthen stir\n"
+    )
+    assert parse_captions(payload, "vtt") == "add two cups flour then stir"
+
+
+def test_vtt_with_crlf_line_endings():
+    payload = (
+        "WEBVTT\r\n\r\n00:00:00.000 --> 00:00:02.000\r\nadd two cups flour\r\n\r\n"
+        "00:00:02.000 --> 00:00:04.000\r\nthen stir\r\n"
+    )
+    assert parse_captions(payload, "vtt") == "add two cups flour then stir"
+
+
+def test_vtt_cue_identifiers_are_dropped():
+    payload = (
+        "WEBVTT\n\n1\n00:00:00.000 --> 00:00:02.000\nadd two cups flour\n\n"
+        "intro-2\n00:00:02.000 --> 00:00:04.000\nthen stir\n"
+    )
+    assert parse_captions(payload, "vtt") == "add two cups flour then stir"
+
+
+def test_srt():
+    payload = "1\r\n00:00:00,000 --> 00:00:02,000\r\nadd two cups flour\r\n\r\n2\r\n00:00:02,000 --> 00:00:04,000\r\nthen stir\r\n"
+    assert parse_captions(payload) == "add two cups flour then stir"
+
+
+def test_json3():
+    payload = (
+        '{"events": [{"tStartMs": 0, "segs": [{"utf8": "add two"}, {"utf8": " cups flour"}]},'
+        ' {"tStartMs": 2000, "segs": [{"utf8": "then \\"stir\\""}]}]}'
+    )
+    assert parse_captions(payload, "json3") == 'add two cups flour then "stir"'
+
+
+def test_xml():
+    payload = '<timedtext><body><p t="0">add two &amp;#39;cups&amp;#39;</p><p t="2000">then stir</p></body></timedtext>'
+    assert parse_captions(payload, "srv3") == "add two 'cups' then stir"
+
+
+def test_sniff_format():
+    assert sniff_format("﻿WEBVTT\n\n") == "vtt"
+    assert sniff_format('{"events": []}') == "json3"
+    assert sniff_format("<transcript>") == "xml"
+    assert sniff_format("plain text") is None
+
+
+def test_unrecognised_payload_is_returned_as_is():
+    assert parse_captions("just some text") == "just some text"
+
+
+def test_rolling_joiner_drops_resent_overlap():
+    joiner = RollingJoiner()
+    for line in ("add two cups", "add two cups", "two cups of flour", "of flour", "then stir"):
+        joiner.add(line)
+    assert joiner.text() == "add two cups of flour then stir"
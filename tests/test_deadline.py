@@ -0,0 +1,69 @@
+import socket
+import sys
+import time
+
+import pytest
+
+from chef_core import deadline
+
+
+class DownloadError(Exception):
+    """Shaped like yt_dlp.utils.DownloadError: the original is kept in exc_info."""
+
+    def __init__(self, msg, exc_info=None):
+        super().__init__(msg)
+        self.exc_info = exc_info
+
+
+def _wrapped_timeout():
+    try:
+        raise socket.timeout("timed out")
+    except socket.timeout:
+        return DownloadError("ERROR: Unable to download webpage: timed out", sys.exc_info())
+
+
+def test_outside_a_budget_only_the_stage_caps_apply():
+    assert deadline.remaining() is None
+    assert deadline.timeout("llm") == deadline.STAGE_BUDGETS["llm"]
+
+
+def test_timeouts_shrink_with_the_budget_then_expire():
+    with deadline.budget(0.05):
+        assert 0 < deadline.timeout("llm") <= 0.05
+        time.sleep(0.06)
+        assert deadline.remaining() == 0.0
+        with pytest.raises(deadline.DeadlineExpired) as expired:
+            deadline.timeout("llm")
+        assert expired.value.stage == "llm"
+    assert deadline.remaining() is None
+
+
+def test_nested_budgets_only_shorten_the_deadline():
+    with deadline.budget(0.05):
+        with deadline.budget(60):
+            assert deadline.remaining() <= 0.05
+        with deadline.budget(0.01):
+            assert deadline.remaining() <= 0.01
+
+
+def test_wrapped_timeouts_are_recognised():
+    assert deadline.is_timeout(_wrapped_timeout())
+    try:
+        try:
+            raise TimeoutError()
+        except TimeoutError as e:
+            raise RuntimeError("request failed") from e
+    except RuntimeError as e:
+        assert deadline.is_timeout(e)
+    assert not deadline.is_timeout(DownloadError("ERROR: Video unavailable"))
+    assert not deadline.is_timeout(ValueError("nope"))
+
+
+def test_guard_turns_a_wrapped_timeout_into_deadline_expired():
+    with pytest.raises(deadline.DeadlineExpired) as expired:
+        with deadline.guard("transcript"):
+            raise _wrapped_timeout()
+    assert expired.value.stage == "transcript"
+    with pytest.raises(ValueError):
+        with deadline.guard("transcript"):
+            raise ValueError("not a timeout")
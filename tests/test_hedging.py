@@ -0,0 +1,75 @@
+import threading
+import time
+
+import pytest
+
+from chef_core.hedging import HedgedRunner
+
+URL = "https://www.youtube.com/watch?v=dQw4w9WgXcQ"
+
+
+def is_valid(text):
+    return bool(text) and "Error" not in text
+
+
+def test_first_valid_result_wins():
+    runner = HedgedRunner()
+    assert runner.run(URL, [("a", lambda url: "transcript a")], is_valid) == "transcript a"
+
+
+def test_invalid_result_starts_the_next_strategy():
+    runner = HedgedRunner()
+    strategies = [("a", lambda url: "Error: nope"), ("b", lambda url: "transcript b")]
+    assert runner.run(URL, strategies, is_valid) == "transcript b"
+
+
+def test_slow_strategy_is_hedged():
+    release = threading.Event()
+
+    def slow(url):
+        release.wait(5)
+        return "slow"
+
+    runner = HedgedRunner()
+    runner.stats_for("youtube", "slow").record(True, 0.01, time.monotonic())   # hedge after ~0.25s
+    started = time.monotonic()
+    try:
+        assert runner.run(URL, [("slow", slow), ("fast", lambda url: "fast")], is_valid) == "fast"
+    finally:
+        release.set()
+    assert time.monotonic() - started < 2
+
+
+def test_last_rejected_result_when_nothing_is_valid():
+    def broken(url):
+        raise RuntimeError("boom")
+
+    runner = HedgedRunner()
+    strategies = [("a", lambda url: "Error: no captions"), ("b", broken)]
+    assert runner.run(URL, strategies, is_valid) == "Error: no captions"
+
+
+def test_timeout():
+    release = threading.Event()
+    runner = HedgedRunner()
+    try:
+        with pytest.raises(TimeoutError):
+            runner.run(URL, [("stuck", lambda url: release.wait(5) and "late")], is_valid, timeout=0.1)
+    finally:
+        release.set()
+
+
+def test_breaker_skips_a_failing_strategy():
+    runner = HedgedRunner()
+    calls = []
+
+    def failing(url):
+        calls.append(url)
+        raise RuntimeError("boom")
+
+    for _ in range(3):
+        runner.run(URL, [("failing", failing), ("ok", lambda url: "ok")], is_valid)
+    calls.clear()
+    assert runner.run(URL, [("failing", failing), ("ok", lambda url: "ok")], is_valid) == "ok"
+    time.sleep(0.05)
+    assert calls == []
@@ -0,0 +1,67 @@
+from chef_core.ingredients import extract_ingredients, local_ingredients, parse_item
+
+QUANTIFIED = (
+    "first two tablespoons of olive oil, then 12 oz spaghetti, 3 cloves of garlic, one pound of shrimp, "
+    "half a cup of white wine, 4 tbsp butter, a pinch of salt, 1 teaspoon red pepper flakes, "
+    "2 cups of heavy cream. "
+)
+
+
+def test_quantities_are_read_from_the_transcript():
+    result = extract_ingredients(QUANTIFIED)
+    assert result["items"][:3] == ["2 tbsp Olive oil", "12 oz Spaghetti", "3 cloves Garlic"]
+    assert "1/2 cup White wine" in result["items"]
+    assert result["confidence"] == 1.0
+
+
+def test_unquantified_foods_stay_on_the_list():
+    text = QUANTIFIED + "top with parmesan and some basil"
+    result = extract_ingredients(text)
+    assert result["unquantified"] == ["basil", "parmesan"]
+    assert 0.8 <= result["confidence"] < 1.0
+    items = local_ingredients(text)
+    assert items[-2:] == ["Basil", "Parmesan"]
+
+
+def test_food_categories_are_not_listed_twice():
+    items = local_ingredients(QUANTIFIED + "drain the pasta")
+    assert "Pasta" not in items
+    assert "12 oz Spaghetti" in items
+
+
+def test_measured_unknown_food_falls_back_to_the_llm():
+    text = QUANTIFIED + "stir in 3 tablespoons of harissa"
+    result = extract_ingredients(text)
+    assert result["unrecognised"] == ["harissa"]
+    assert result["confidence"] == 0.0
+    assert local_ingredients(text) is None
+    # The deadline's partial recipe still gets whatever was found
+    assert "2 tbsp Olive oil" in local_ingredients(text, min_confidence=0)
+
+
+def test_measured_non_food_words_are_ignored():
+    text = QUANTIFIED + "about two tablespoons once it's chopped, and two tablespoons of juice"
+    assert extract_ingredients(text)["unrecognised"] == []
+
+
+def test_vocabulary_covers_common_pantry_items():
+    assert "2 tbsp Tahini" in extract_ingredients(QUANTIFIED + "and 2 tbsp of tahini")["items"]
+
+
+def test_too_few_items_is_not_trusted():
+    assert local_ingredients("add 2 cups of flour and stir") is None
+
+
+def test_parse_item():
+    assert parse_item("2 tbsp Olive oil") == {"value": 2.0, "unit": "tbsp", "name": "Olive oil", "estimated": False}
+    assert parse_item("(Est.) 1 1/2 cups Milk") == {"value": 1.5, "unit": "cup", "name": "Milk", "estimated": True}
+    assert parse_item("Basil") == {"value": None, "unit": None, "name": "Basil", "estimated": False}
+
+
+def test_singular_and_plural_are_one_food():
+    text = QUANTIFIED + "dice two onions, add 1 egg, cook the onion until soft, then beat in 2 eggs"
+    result = extract_ingredients(text)
+    assert "2 Onions" in result["items"]
+    assert "1 Egg" in result["items"]
+    assert not any(item.endswith(("Onion", "Eggs")) for item in result["items"])
+    assert "onion" not in result["unquantified"]
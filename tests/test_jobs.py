@@ -0,0 +1,41 @@
+import pytest
+
+from chef_core.jobs import JobQueue
+
+URL = "https://www.youtube.com/watch?v=dQw4w9WgXcQ"
+
+
+def _queue(results):
+    """JobQueue whose jobs return (or raise) the next entry of `results`."""
+    results = iter(results)
+
+    def run(url):
+        result = next(results)
+        if isinstance(result, Exception):
+            raise result
+        return {"url": url, **result}
+
+    return JobQueue(run=run, max_workers=1)
+
+
+def _finished(jobs, url=URL):
+    job = jobs.submit(url)
+    assert job.wait(5)
+    return job
+
+
+def test_finished_jobs_are_reused():
+    jobs = _queue([{"meta": "Easy | 10 min"}])
+    job = _finished(jobs)
+    assert job.status == "done"
+    assert _finished(jobs, "https://youtu.be/dQw4w9WgXcQ") is job
+
+
+@pytest.mark.parametrize("first", [{"partial": True, "meta": "Unknown | Unknown"}, RuntimeError("no captions")])
+def test_a_resubmit_retries_a_partial_or_failed_job(first):
+    jobs = _queue([first, {"meta": "Easy | 10 min"}])
+    job = _finished(jobs)
+    retry = _finished(jobs)
+    assert retry is not job
+    assert retry.status == "done"
+    assert retry.result == {"url": URL, "meta": "Easy | 10 min"}
@@ -0,0 +1,52 @@
+import types
+
+from chef_core import mapreduce
+from chef_core.cache import get_cached_recipe, recipe_cache_key
+from chef_core.recipe import SPLIT
+
+MODEL = "models/test-model"
+
+
+def _transcript(tag):
+    # Long enough for three chunks
+    return " ".join(f"{tag}{i}" for i in range(2 * mapreduce.CHUNK_WORDS))
+
+
+def _answer_with(answers, monkeypatch):
+    def generate(model_name, prompt):
+        part = int(prompt.split("This is part ")[1].split()[0])
+        return types.SimpleNamespace(text=answers[part])
+
+    monkeypatch.setattr(mapreduce, "generate", generate)
+
+
+def _cached(text):
+    return get_cached_recipe(recipe_cache_key(text, mapreduce.CHUNKED_PROMPT_VERSION, MODEL))
+
+
+def test_complete_chunks_are_merged_and_cached(monkeypatch):
+    _answer_with({
+        1: f"Easy | 20 min {SPLIT} 1. Boil the pasta {SPLIT} 12 oz Spaghetti",
+        2: f"Unknown | Unknown {SPLIT} 1. Fry the garlic {SPLIT} 3 cloves Garlic",
+        3: f"Unknown | Unknown {SPLIT} None {SPLIT} None",
+    }, monkeypatch)
+    text = _transcript("complete")
+    recipe = mapreduce.extract_recipe_chunked(text, MODEL)
+    assert recipe == {
+        "meta": "Easy | 20 min",
+        "instructions": "1. Boil the pasta\n2. Fry the garlic",
+        "ingredients": ["12 oz Spaghetti", "3 cloves Garlic"],
+    }
+    assert _cached(text) == recipe
+
+
+def test_chunk_without_sections_is_not_cached(monkeypatch):
+    _answer_with({
+        1: f"Easy | 20 min {SPLIT} 1. Boil the pasta {SPLIT} 12 oz Spaghetti",
+        2: "Sorry, I can only see part of this video.",
+        3: f"Unknown | Unknown {SPLIT} None {SPLIT} None",
+    }, monkeypatch)
+    text = _transcript("broken")
+    recipe = mapreduce.extract_recipe_chunked(text, MODEL)
+    assert recipe["ingredients"] == ["12 oz Spaghetti"]
+    assert _cached(text) is None
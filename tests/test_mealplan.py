@@ -0,0 +1,15 @@
+from chef_core.mealplan import merge_shopping_lists
+
+
+def test_merge_shopping_lists_sums_convertible_amounts():
+    merged = merge_shopping_lists([
+        ["2 tbsp Olive oil", "3 cloves Garlic", "1 cup Milk", "Basil"],
+        ["1/4 cup olive oil", "2 cloves garlic", "200 g Flour", "basil", "(Est.) 1 tsp Salt"],
+        ["1 lb Flour"],
+    ])
+    assert merged == ["6 tbsp Olive oil", "5 cloves Garlic", "1 cup Milk", "Basil", "654 g Flour", "(Est.) 1 tsp Salt"]
+
+
+def test_merge_shopping_lists_keeps_incompatible_units_apart():
+    merged = merge_shopping_lists([["1 cup Flour"], ["200 g Flour"]])
+    assert merged == ["1 cup Flour", "200 g Flour"]
@@ -0,0 +1,46 @@
+import types
+
+import pytest
+
+from chef_core import clients, models, pipeline
+
+RETIRED = "models/gemini-1.5-flash"
+LIVE = "models/gemini-2.5-flash"
+
+
+@pytest.fixture
+def catalogue(monkeypatch):
+    """Gemini stand-in where only LIVE exists; returns the models called, in order."""
+    monkeypatch.setattr(models, "_resolved", None)
+    monkeypatch.setattr(models, "_failed", set())
+    monkeypatch.setattr(models, "_replacements", {})
+    listing = [types.SimpleNamespace(name=LIVE, supported_generation_methods=["generateContent"])]
+    monkeypatch.setattr(clients, "genai", lambda: types.SimpleNamespace(list_models=lambda **kwargs: listing))
+    calls = []
+
+    class Model:
+        def __init__(self, name):
+            self.name = name
+
+        def generate_content(self, prompt, **kwargs):
+            calls.append(self.name)
+            if self.name != LIVE:
+                raise clients.not_found_error()("model retired")
+            return types.SimpleNamespace(text=f"answer to {prompt}")
+
+    monkeypatch.setattr(clients, "generative_model", Model)
+    return calls
+
+
+def test_retired_model_is_replaced_once(catalogue):
+    assert pipeline.generate(RETIRED, "first").text == "answer to first"
+    assert catalogue == [RETIRED, LIVE]
+    # A caller still holding the retired name goes straight to its replacement
+    assert pipeline.generate(RETIRED, "second").text == "answer to second"
+    assert catalogue == [RETIRED, LIVE, LIVE]
+    assert models.resolve_model(RETIRED) == LIVE
+
+
+def test_resolve_model_without_a_name_uses_the_default(catalogue):
+    assert models.resolve_model() == models.get_valid_model()
+    assert models.resolve_model(LIVE) == LIVE
@@ -0,0 +1,61 @@
+import threading
+
+from chef_core import prefetch
+
+
+def _finished(key, fn, valid=None):
+    future = prefetch.prefetch(key, fn, valid=valid)
+    # Callbacks run in order, so once this one has, prefetch's own has too
+    called_back = threading.Event()
+    future.add_done_callback(lambda done: called_back.set())
+    assert called_back.wait(5)
+    return future
+
+
+def _remembered(key):
+    with prefetch._lock:
+        return key in prefetch._futures
+
+
+def _fail():
+    raise RuntimeError("boom")
+
+
+def test_good_results_are_kept_for_take():
+    key = ("transcript", "test:good")
+    _finished(key, lambda: "transcript", valid=bool)
+    assert _remembered(key)
+    assert prefetch.take(key, lambda: "inline", valid=bool) == "transcript"
+
+
+def test_errors_are_dropped_when_they_finish():
+    key = ("transcript", "test:error")
+    _finished(key, _fail)
+    assert not _remembered(key)
+    # The next click does the work again
+    assert prefetch.take(key, lambda: "inline") == "inline"
+
+
+def test_invalid_results_are_dropped_when_they_finish():
+    key = ("transcript", "test:invalid")
+    _finished(key, lambda: "Error: No captions found.", valid=lambda text: "Error" not in text)
+    assert not _remembered(key)
+
+
+def test_a_newer_prefetch_is_not_dropped_by_an_old_failure():
+    key = ("transcript", "test:replaced")
+    release = threading.Event()
+
+    def slow_failure():
+        release.wait(5)
+        raise RuntimeError("late")
+
+    old = prefetch.prefetch(key, slow_failure)
+    prefetch.discard(key)
+    _finished(key, lambda: "fresh")
+    old_called_back = threading.Event()
+    old.add_done_callback(lambda done: old_called_back.set())
+    release.set()
+    assert old_called_back.wait(5)
+    assert _remembered(key)
+    assert prefetch.take(key, lambda: "inline") == "fresh"
@@ -0,0 +1,36 @@
+from chef_core.recipe import SPLIT, SectionSplitter, has_sections, parse_recipe_response
+
+
+def _split(text, size):
+    splitter = SectionSplitter()
+    sections = []
+    for i in range(0, len(text), size):
+        sections.extend(splitter.feed(text[i:i + size]))
+    return sections + [splitter.close()]
+
+
+def test_section_splitter_matches_str_split_for_any_chunking():
+    text = f"Easy | 10 min {SPLIT} 1. Boil {SPLIT} 1 cup Rice | Salt"
+    for size in range(1, len(text) + 1):
+        assert _split(text, size) == text.split(SPLIT)
+
+
+def test_section_splitter_without_separator():
+    assert _split("no separator here", 3) == ["no separator here"]
+
+
+def test_parse_recipe_response():
+    recipe = parse_recipe_response(f"Easy | 10 min {SPLIT} 1. Boil {SPLIT} 1 cup Rice | to taste\nSalt")
+    assert recipe == {"meta": "Easy | 10 min", "instructions": "1. Boil", "ingredients": ["1 cup Rice", "Salt"]}
+
+
+def test_parse_recipe_response_without_sections():
+    recipe = parse_recipe_response("Just prose")
+    assert recipe == {"meta": "Unknown | Unknown", "instructions": "Just prose", "ingredients": []}
+
+
+def test_has_sections():
+    assert has_sections(f"a {SPLIT} b {SPLIT} c", 3)
+    assert not has_sections(f"a {SPLIT} b", 3)
+    assert has_sections(f"a {SPLIT} b", 2)
+    assert not has_sections("a", 2)
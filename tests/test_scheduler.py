@@ -0,0 +1,123 @@
+import threading
+import time
+import types
+
+import pytest
+
+from chef_core import clients, deadline, pipeline, scheduler
+from chef_core.scheduler import Scheduler, TokenBucket
+
+
+class ServiceUnavailable(Exception):
+    pass
+
+
+def test_bucket_serves_a_burst_then_waits_for_the_refill():
+    bucket = TokenBucket(rate=50, capacity=2)
+    assert bucket.acquire() == 0.0
+    assert bucket.acquire() == 0.0
+    start = time.monotonic()
+    waited = bucket.acquire()
+    assert waited == pytest.approx(0.02, abs=0.005)
+    assert time.monotonic() - start >= waited * 0.9
+
+
+def test_bucket_refuses_a_wait_longer_than_max_wait():
+    bucket = TokenBucket(rate=1, capacity=1)
+    bucket.acquire()
+    assert bucket.acquire(max_wait=0.1) is None
+    # Refusing doesn't spend the token the next caller is waiting for
+    assert bucket.acquire(max_wait=1.5) == pytest.approx(1.0, abs=0.05)
+
+
+def test_retryable_errors_are_retried(monkeypatch):
+    monkeypatch.setattr(scheduler, "backoff_delay", lambda attempt: 0)
+    attempts = []
+
+    def flaky():
+        attempts.append(1)
+        if len(attempts) < 3:
+            raise ServiceUnavailable()
+        return "ok"
+
+    assert Scheduler(rate_per_minute=0, max_retries=2).submit(flaky) == "ok"
+    assert len(attempts) == 3
+
+
+def test_other_errors_and_exhausted_retries_are_raised(monkeypatch):
+    monkeypatch.setattr(scheduler, "backoff_delay", lambda attempt: 0)
+    attempts = []
+
+    def broken(exc):
+        attempts.append(1)
+        raise exc
+
+    with pytest.raises(ValueError):
+        Scheduler(rate_per_minute=0).submit(lambda: broken(ValueError()))
+    assert len(attempts) == 1
+    with pytest.raises(ServiceUnavailable):
+        Scheduler(rate_per_minute=0, max_retries=1).submit(lambda: broken(ServiceUnavailable()))
+    assert len(attempts) == 3
+
+
+@pytest.fixture
+def slow_gemini(monkeypatch):
+    """generate_content() that blocks until released; returns (calls, release)."""
+    monkeypatch.setattr(clients, "genai", lambda: types.SimpleNamespace(configure=lambda **kwargs: None))
+    monkeypatch.setattr(clients, "_api_key", None)
+    calls = []
+    release = threading.Event()
+
+    class Model:
+        def __init__(self, name):
+            pass
+
+        def generate_content(self, prompt, **kwargs):
+            calls.append(clients.configured_key())
+            release.wait(5)
+            return types.SimpleNamespace(text=f"answer for {clients.configured_key()}")
+
+    monkeypatch.setattr(clients, "generative_model", Model)
+    return calls, release
+
+
+def _generate_concurrently(api_keys, release):
+    answers = {}
+
+    def run(api_key):
+        clients.configure(api_key)
+        answers[threading.current_thread().name] = pipeline.generate("models/test-model", "same prompt").text
+
+    threads = [threading.Thread(target=run, args=(api_key,), name=f"t{i}") for i, api_key in enumerate(api_keys)]
+    for thread in threads:
+        thread.start()
+        time.sleep(0.05)    # each caller arrives while the first is in flight
+    release.set()
+    for thread in threads:
+        thread.join(5)
+    return [answers[thread.name] for thread in threads]
+
+
+def test_identical_requests_with_one_key_are_coalesced(slow_gemini):
+    calls, release = slow_gemini
+    assert _generate_concurrently(["key-a", "key-a"], release) == ["answer for key-a"] * 2
+    assert calls == ["key-a"]
+
+
+def test_requests_with_different_keys_are_not_coalesced(slow_gemini):
+    calls, release = slow_gemini
+    answers = _generate_concurrently(["key-a", "key-b"], release)
+    assert answers == ["answer for key-a", "answer for key-b"]
+    assert sorted(calls) == ["key-a", "key-b"]
+
+
+def test_no_queueing_for_a_token_due_after_the_deadline():
+    limited = Scheduler(rate_per_minute=60, burst=1)
+    calls = []
+    limited.submit(lambda: calls.append(1))
+    start = time.monotonic()
+    with deadline.budget(0.2), pytest.raises(deadline.DeadlineExpired):
+        # The next token is a second away
+        limited.submit(lambda: calls.append(2))
+    assert time.monotonic() - start < 0.2
+    assert calls == [1]
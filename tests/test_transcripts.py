@@ -0,0 +1,80 @@
+import sys
+
+from chef_core import clients, metrics, transcripts
+
+URL = "https://www.youtube.com/watch?v=dQw4w9WgXcQ"
+
+
+def _formats(lang):
+    return [
+        {"ext": ext, "url": f"https://example.com/{lang}.{ext}", "name": "auto-translated"}
+        for ext in ("json3", "srv1", "srv2", "srv3", "ttml", "vtt")
+    ]
+
+
+def _probe(monkeypatch, info):
+    class FakeYoutubeDL:
+        def __init__(self, opts):
+            pass
+
+        def __enter__(self):
+            return self
+
+        def __exit__(self, *exc):
+            return False
+
+        def extract_info(self, url, download, process):
+            return info
+
+    monkeypatch.setattr(clients, "youtube_dl_class", lambda: FakeYoutubeDL)
+    return transcripts.probe_captions(URL)
+
+
+def test_only_the_picked_language_is_kept(monkeypatch):
+    languages = ["af", "de", "en-orig", "fr", "zu"]
+    captions = _probe(monkeypatch, {"automatic_captions": {lang: _formats(lang) for lang in languages}})
+    assert list(captions) == ["en-orig"]
+    assert captions["en-orig"][0] == {"ext": "json3", "url": "https://example.com/en-orig.json3"}
+    assert transcripts.pick_caption_track(captions)["url"] == "https://example.com/en-orig.json3"
+
+
+def test_uploaded_subtitles_win_over_auto_captions(monkeypatch):
+    captions = _probe(monkeypatch, {
+        "subtitles": {"es": _formats("es"), "pt": _formats("pt")},
+        "automatic_captions": {"en": _formats("en")},
+    })
+    assert list(captions) == ["es"]
+
+
+def test_no_captions(monkeypatch):
+    assert _probe(monkeypatch, {"subtitles": {}, "automatic_captions": {}}) is None
+
+
+def test_a_wrapped_ytdlp_timeout_is_reported_as_a_timeout(monkeypatch):
+    class DownloadError(Exception):
+        def __init__(self, msg, exc_info=None):
+            super().__init__(msg)
+            self.exc_info = exc_info
+
+    class StalledYoutubeDL:
+        def __init__(self, opts):
+            pass
+
+        def __enter__(self):
+            return self
+
+        def __exit__(self, *exc):
+            return False
+
+        def extract_info(self, url, download, process):
+            try:
+                raise TimeoutError("The read operation timed out")
+            except TimeoutError:
+                raise DownloadError("ERROR: Unable to download webpage", sys.exc_info()) from None
+
+    monkeypatch.setattr(clients, "youtube_dl_class", lambda: StalledYoutubeDL)
+    monkeypatch.setattr(transcripts, "cached_caption_tracks", lambda url, probe: probe(url))
+    counter = ("timeouts", (("stage", "transcript"),))
+    before = metrics.snapshot()[1].get(counter, 0)
+    assert transcripts.ytdlp_transcript(URL) == transcripts.TIMEOUT_ERROR
+    assert metrics.snapshot()[1][counter] == before + 1
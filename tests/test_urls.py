@@ -0,0 +1,30 @@
+from chef_core.urls import canonical_video_key, extract_youtube_id, is_video_url
+
+VIDEO_ID = "dQw4w9WgXcQ"
+
+
+def test_youtube_links_share_a_key():
+    links = [
+        f"https://www.youtube.com/watch?v={VIDEO_ID}",
+        f"https://m.youtube.com/watch?feature=share&v={VIDEO_ID}",
+        f"https://youtu.be/{VIDEO_ID}?si=abc",
+        f"youtu.be/{VIDEO_ID}",
+        f"https://www.youtube.com/shorts/{VIDEO_ID}/",
+    ]
+    assert {canonical_video_key(link) for link in links} == {f"yt:{VIDEO_ID}"}
+
+
+def test_v_parameters_on_other_hosts_are_not_youtube_ids():
+    a = "https://www.tiktok.com/@a/video/1?lang=en&prev=abc"
+    b = "https://www.tiktok.com/@b/video/2?lang=en&prev=abc"
+    assert extract_youtube_id(a) is None
+    assert canonical_video_key(a) == "url:tiktok.com/@a/video/1"
+    assert canonical_video_key(a) != canonical_video_key(b)
+
+
+def test_is_video_url():
+    assert is_video_url(f"https://youtu.be/{VIDEO_ID}")
+    assert is_video_url("https://www.instagram.com/reel/abc/")
+    assert not is_video_url("https://www.youtube.com/watch?v=short")
+    assert not is_video_url(f"https://notyoutube.com/watch?v={VIDEO_ID}")
+    assert not is_video_url("https://www.tiktok.com/")